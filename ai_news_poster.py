@@ -1,14 +1,144 @@
 import os
+import re
 import sys
+import threading
 import requests
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts only get per-process locking
+    fcntl = None
+from analysis_cache import AnalysisCache
+from article_ranker import ArticleRanker
+from deepseek_client import get_deepseek_client, iter_stream_content
+from digest_templates import DEFAULT_TEMPLATE, DigestTemplate
+from duplicate_index import DuplicateIndex
+from fanout_publisher import FanoutPublisher, load_targets
+from linkedin_api import LINKEDIN_API_URL, build_ugc_post, extract_post_id, linkedin_headers, person_urn
+from metrics import timed
+from news_sources import NEWS_API_URL, build_sources, stream_articles
+from post_history import PostHistory
+from rate_limiter import RateLimitedAdapter
+from replay_transport import install_transport
+from run_checkpoints import CheckpointStore
 
 # Load environment variables
 load_dotenv()
 
+# DeepSeek model and prompts used for article analysis
+DEEPSEEK_MODEL = 'deepseek-chat'
+ANALYSIS_SYSTEM_PROMPT = 'You are an AI expert analyzing tech news. Be concise and insightful. Always respond in the exact format requested, using | as separators.'
+ANALYSIS_PROMPT = """Analyze this AI news article and provide exactly three parts, separated by '|' characters:
+
+1. Key takeaway (one clear sentence)
+2. Impact on industry/society (one clear sentence)
+3. Why it matters for professionals (one clear sentence)
+
+Important: Your response MUST follow this EXACT format:
+[Key takeaway sentence] | [Impact sentence] | [Why it matters sentence]
+
+Example format:
+New AI model achieves breakthrough in medical diagnosis | This advancement could revolutionize healthcare delivery worldwide | Medical professionals can now diagnose conditions with greater accuracy and speed.
+
+Article to analyze:
+{content}"""
+BATCH_ANALYSIS_PROMPT = """Analyze each of the following AI news articles and provide exactly three parts per article, separated by '|' characters:
+
+1. Key takeaway (one clear sentence)
+2. Impact on industry/society (one clear sentence)
+3. Why it matters for professionals (one clear sentence)
+
+Important: Respond with exactly one line per article, starting with the article number in square brackets, in this EXACT format:
+[1] [Key takeaway sentence] | [Impact sentence] | [Why it matters sentence]
+
+Example format:
+[1] New AI model achieves breakthrough in medical diagnosis | This advancement could revolutionize healthcare delivery worldwide | Medical professionals can now diagnose conditions with greater accuracy and speed.
+
+Articles to analyze:
+{articles}"""
+
+# Matches one numbered line of a batch analysis response, e.g. "[2] takeaway | impact | why"
+BATCH_LINE_PATTERN = re.compile(r'^\s*\[?(\d+)[\].):]*\s*(.+)$')
+
+# A sentence terminator (with any closing quote or bracket), then whitespace and the next word
+SENTENCE_END = re.compile(r'([.!?]["\')\]]?)\s+(\S)')
+# Words whose trailing period does not end a sentence, besides initials like "U.S." or "e.g."
+ABBREVIATIONS = frozenset([
+    'inc', 'ltd', 'corp', 'co', 'llc', 'plc', 'etc', 'vs', 'mr', 'mrs', 'ms', 'dr', 'prof',
+    'st', 'jr', 'sr', 'no', 'approx', 'est', 'dept', 'fig', 'al', 'jan', 'feb', 'mar', 'apr',
+    'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec'
+])
+INITIALS = re.compile(r'[a-z](?:\.[a-z])*')
+
+# Default analysis used when an article cannot be analyzed
+DEFAULT_ANALYSIS = {
+    'takeaway': "This article discusses important developments in AI technology.",
+    'impact': "These developments could significantly influence the AI landscape.",
+    'why_matters': "Staying informed about AI advancements is crucial for professional growth."
+}
+
+# Impact and why-it-matters used when a reply is not in the three-part format
+FORMAT_FALLBACK_ANALYSIS = {
+    'impact': "This development could have significant implications for the AI industry.",
+    'why_matters': "Professionals should monitor these developments to stay competitive."
+}
+
+def is_usable_analysis(analysis):
+    """True only for an analysis parsed from a DeepSeek reply, not None or a fallback."""
+    if not isinstance(analysis, dict):
+        return False
+    if not all(analysis.get(field) for field in ('takeaway', 'impact', 'why_matters')):
+        return False
+    if analysis == DEFAULT_ANALYSIS:
+        return False
+    return not all(analysis[field] == value for field, value in FORMAT_FALLBACK_ANALYSIS.items())
+
+def _sentence_end(text):
+    """Index just past the first complete sentence of ``text``, or None while none is complete.
+
+    A sentence ends at '.', '!' or '?' followed by whitespace and a word that
+    does not start in lowercase. A period after an abbreviation ("Inc.",
+    "e.g.", "U.S.") does not count, and decimals never match since the
+    period must be followed by whitespace.
+    """
+    for match in SENTENCE_END.finditer(text):
+        if match.group(2).islower():
+            continue
+        if match.group(1).startswith('.'):
+            words = text[:match.start()].split()
+            word = words[-1].lstrip('(["\'').lower() if words else ''
+            if word in ABBREVIATIONS or INITIALS.fullmatch(word):
+                continue
+        return match.end(1)
+    return None
+
+def read_streamed_analysis(chunks):
+    """Assemble a streamed 'takeaway | impact | why' reply, stopping once the third field is complete.
+
+    The third field ends at its first sentence end (see ``_sentence_end``),
+    a line break or another '|', whichever comes first; nothing after it is
+    kept. Returns the text received so far if the stream ends earlier.
+    """
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        if buffer.count('|') < 2:
+            continue
+        first, second, final = buffer.split('|', 2)
+        final = final.lstrip()
+        ends = [len(final.split('|', 1)[0]) if '|' in final else None,
+                final.find('\n') if '\n' in final else None,
+                _sentence_end(final)]
+        ends = [end for end in ends if end is not None]
+        if ends:
+            return f"{first}|{second}| {final[:min(ends)]}".strip()
+    return buffer.strip()
+
 def log_message(message, level="INFO"):
     """Log messages with timestamp and level."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -23,6 +153,10 @@ class AINewsPoster:
             'NEWS_API_KEY': os.getenv('NEWS_API_KEY'),
             'DEEPSEEK_API_KEY': os.getenv('DEEPSEEK_API_KEY')
         }
+
+        # NewsAPI is optional when RSS feeds or local files provide the articles
+        if os.getenv('NEWS_RSS_FEEDS') or os.getenv('NEWS_FILE_SOURCES'):
+            required_vars.pop('NEWS_API_KEY')
         
         missing_vars = [key for key, value in required_vars.items() if not value]
         if missing_vars:
@@ -32,8 +166,9 @@ class AINewsPoster:
 
         self.access_token = required_vars['LINKEDIN_ACCESS_TOKEN']
         self.linkedin_id = required_vars['LINKEDIN_PERSON_ID']
-        self.news_api_key = required_vars['NEWS_API_KEY']
+        self.news_api_key = os.getenv('NEWS_API_KEY')
         self.deepseek_api_key = required_vars['DEEPSEEK_API_KEY']
+        self.deepseek = get_deepseek_client(self.deepseek_api_key)
         
         log_message(f"Initialized with LinkedIn ID: {self.linkedin_id}")
         
@@ -45,57 +180,130 @@ class AINewsPoster:
         )
         self.session = requests.Session()
         self.session.mount("https://", HTTPAdapter(max_retries=self.retry_strategy))
+        # Upstream-specific adapters draw from the shared per-host rate limit budgets
+        self.session.mount(NEWS_API_URL, RateLimitedAdapter('newsapi', max_retries=self.retry_strategy))
+        self.session.mount(LINKEDIN_API_URL, RateLimitedAdapter('linkedin', max_retries=self.retry_strategy))
+        # Record or replay upstream traffic when HTTP_TRANSPORT_MODE is set
+        install_transport(self.session)
+
+        # Sources are fetched concurrently and merged into a single article stream
+        self.news_sources = build_sources(self.news_api_key, session=self.session)
+        self.source_max_workers = max(1, int(os.getenv('NEWS_SOURCE_MAX_WORKERS', '4')))
+
+        # Candidates are scored as a pool and the best ones selected
+        self.candidate_pool_size = max(1, int(os.getenv('NEWS_CANDIDATE_POOL_SIZE', '200')))
+        self.ranker = ArticleRanker(half_life_hours=float(os.getenv('NEWS_RECENCY_HALF_LIFE_HOURS', '24')))
+
+        # Maximum number of DeepSeek analyses in flight at once
+        self.analysis_max_workers = max(1, int(os.getenv('ANALYSIS_MAX_WORKERS', '4')))
+
+        # Compiled template used to render the digest post
+        template_path = os.getenv('DIGEST_TEMPLATE_PATH')
+        self.digest_template = DigestTemplate.from_file(template_path) if template_path else DEFAULT_TEMPLATE
+
+        # Stream single-article analyses and stop reading once all three fields are in
+        self.analysis_streaming = os.getenv('ANALYSIS_STREAMING', 'false').lower() in ('1', 'true', 'yes')
+
+        # Number of articles sent per DeepSeek request; 1 disables batch mode
+        self.analysis_batch_size = max(1, int(os.getenv('ANALYSIS_BATCH_SIZE', '1')))
+
+        # Persistent cache of DeepSeek analyses, shared across runs and processes
+        self.analysis_cache = None
+        if os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no'):
+            try:
+                self.analysis_cache = AnalysisCache(
+                    os.getenv('ANALYSIS_CACHE_PATH', '.cache/analysis_cache.db'),
+                    ttl_seconds=int(os.getenv('ANALYSIS_CACHE_TTL', str(7 * 24 * 3600))),
+                    max_entries=int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '5000'))
+                )
+            except Exception as e:
+                log_message(f"Analysis cache disabled: {e}", "WARNING")
+
+        # Fingerprints of posted stories, used to drop syndicated near-duplicates
+        self.duplicate_index = None
+        if os.getenv('DUPLICATE_INDEX_ENABLED', 'true').lower() not in ('0', 'false', 'no'):
+            try:
+                self.duplicate_index = DuplicateIndex(
+                    os.getenv('DUPLICATE_INDEX_PATH', '.cache/duplicate_index.db'),
+                    max_distance=int(os.getenv('DUPLICATE_MAX_DISTANCE', '3')),
+                    retention_days=int(os.getenv('DUPLICATE_RETENTION_DAYS', '14'))
+                )
+            except Exception as e:
+                log_message(f"Duplicate index disabled: {e}", "WARNING")
+
+        # Record of posted digests, used to skip articles that were already shared
+        self.post_history = None
+        self.last_post_id = None
+        if os.getenv('POST_HISTORY_ENABLED', 'true').lower() not in ('0', 'false', 'no'):
+            try:
+                self.post_history = PostHistory(os.getenv('POST_HISTORY_PATH', '.cache/post_history.db'))
+            except Exception as e:
+                log_message(f"Post history disabled: {e}", "WARNING")
+
+        # Job queue for per-account fan-out; None publishes inline
+        self.fanout_queue = None
+
+        # Serializes fetches from the scheduled run and the ingestion jobs, across worker processes too
+        self._fetch_lock = threading.Lock()
+        self.fetch_lock_path = os.getenv('FETCH_LOCK_PATH', '.cache/fetch.lock')
+
+        # Per-run stage outputs, so a failed run can resume from its last completed stage
+        self.checkpoints = None
+        self.run_id = None
+        if os.getenv('CHECKPOINTS_ENABLED', 'true').lower() not in ('0', 'false', 'no'):
+            try:
+                self.checkpoints = CheckpointStore(
+                    os.getenv('CHECKPOINT_DIR', '.cache/checkpoints'),
+                    ttl_seconds=int(os.getenv('CHECKPOINT_TTL', str(6 * 3600)))
+                )
+            except Exception as e:
+                log_message(f"Run checkpoints disabled: {e}", "WARNING")
 
     def analyze_article(self, article):
         """Use Deepseek AI to analyze the article and generate insights."""
         try:
+            cache_key = None
+            if self.analysis_cache:
+                # Streamed replies stop at the end of the third field, so they are cached apart
+                model_key = f"{DEEPSEEK_MODEL}:stream" if self.analysis_streaming else DEEPSEEK_MODEL
+                cache_key = AnalysisCache.make_key(article, ANALYSIS_PROMPT, model_key)
+                cached = self.analysis_cache.get(cache_key)
+                if cached:
+                    return cached
+
             # Combine title and description for analysis
             content = f"{article['title']}\n{article.get('description', '')}"
             
-            prompt = """Analyze this AI news article and provide exactly three parts, separated by '|' characters:
-
-1. Key takeaway (one clear sentence)
-2. Impact on industry/society (one clear sentence)
-3. Why it matters for professionals (one clear sentence)
-
-Important: Your response MUST follow this EXACT format:
-[Key takeaway sentence] | [Impact sentence] | [Why it matters sentence]
-
-Example format:
-New AI model achieves breakthrough in medical diagnosis | This advancement could revolutionize healthcare delivery worldwide | Medical professionals can now diagnose conditions with greater accuracy and speed.
-
-Article to analyze:
-{content}"""
-            
-            headers = {
-                'Authorization': f'Bearer {self.deepseek_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            data = {
-                'messages': [
-                    {
-                        'role': 'system', 
-                        'content': 'You are an AI expert analyzing tech news. Be concise and insightful. Always respond in the exact format requested, using | as separators.'
-                    },
-                    {
-                        'role': 'user', 
-                        'content': prompt.format(content=content)
-                    }
-                ],
-                'model': 'deepseek-chat',
-                'temperature': 0.5,  # Reduced temperature for more consistent formatting
-                'max_tokens': 200
-            }
+            messages = [
+                {
+                    'role': 'system', 
+                    'content': ANALYSIS_SYSTEM_PROMPT
+                },
+                {
+                    'role': 'user', 
+                    'content': ANALYSIS_PROMPT.format(content=content)
+                }
+            ]
             
-            response = requests.post(
-                'https://api.deepseek.com/v1/chat/completions',
-                json=data,
-                headers=headers
+            response = self.deepseek.chat_completion(
+                messages,
+                model=DEEPSEEK_MODEL,
+                temperature=0.5,  # Reduced temperature for more consistent formatting
+                max_tokens=200,
+                stream=self.analysis_streaming,
+                # The reply is one line; stop generating at its end
+                **({'stop': ['\n']} if self.analysis_streaming else {})
             )
             
             if response.status_code == 200:
-                response_content = response.json()['choices'][0]['message']['content'].strip()
+                if self.analysis_streaming:
+                    try:
+                        response_content = read_streamed_analysis(iter_stream_content(response))
+                    finally:
+                        # Closing early skips the trailing tokens; it costs this one keep-alive connection
+                        response.close()
+                else:
+                    response_content = response.json()['choices'][0]['message']['content'].strip()
                 
                 # More robust splitting and validation
                 parts = [part.strip() for part in response_content.split('|')]
@@ -103,17 +311,19 @@ Article to analyze:
                 if len(parts) != 3:
                     print(f"Warning: Unexpected response format from Deepseek: {response_content}")
                     # Fallback analysis if format is wrong
-                    return {
-                        'takeaway': response_content[:100] + "..." if len(response_content) > 100 else response_content,
-                        'impact': "This development could have significant implications for the AI industry.",
-                        'why_matters': "Professionals should monitor these developments to stay competitive."
-                    }
+                    return dict(
+                        FORMAT_FALLBACK_ANALYSIS,
+                        takeaway=response_content[:100] + "..." if len(response_content) > 100 else response_content
+                    )
                 
-                return {
+                analysis = {
                     'takeaway': parts[0].strip(),
                     'impact': parts[1].strip(),
                     'why_matters': parts[2].strip()
                 }
+                if cache_key:
+                    self.analysis_cache.set(cache_key, analysis)
+                return analysis
             else:
                 print(f"Error from Deepseek API: {response.text}")
                 return None
@@ -121,90 +331,222 @@ Article to analyze:
         except Exception as e:
             print(f"Error analyzing article: {e}")
             # Return a default analysis rather than None
-            return {
-                'takeaway': "This article discusses important developments in AI technology.",
-                'impact': "These developments could significantly influence the AI landscape.",
-                'why_matters': "Staying informed about AI advancements is crucial for professional growth."
+            return dict(DEFAULT_ANALYSIS)
+
+    def _analyze_article_safe(self, article):
+        """Analyze a single article, falling back to the default analysis on failure."""
+        try:
+            return self.analyze_article(article)
+        except Exception as e:
+            print(f"Error analyzing article: {e}")
+            return dict(DEFAULT_ANALYSIS)
+
+    def _parse_batch_analysis(self, response_content, count):
+        """Split a batch response into per-article analyses, None where a line is missing."""
+        analyses = [None] * count
+        for line in response_content.splitlines():
+            match = BATCH_LINE_PATTERN.match(line)
+            if not match:
+                continue
+            index = int(match.group(1)) - 1
+            if index < 0 or index >= count or analyses[index] is not None:
+                continue
+            parts = [part.strip().strip('[]').strip() for part in match.group(2).split('|')]
+            if len(parts) != 3 or not all(parts):
+                continue
+            analyses[index] = {
+                'takeaway': parts[0],
+                'impact': parts[1],
+                'why_matters': parts[2]
             }
+        return analyses
+
+    def analyze_articles_batch(self, articles):
+        """Analyze several articles with a single DeepSeek request.
+
+        Articles the response cannot be matched to are retried one at a time
+        through analyze_article.
+        """
+        analyses = [None] * len(articles)
+        cache_keys = [None] * len(articles)
+        pending = []
+        for i, article in enumerate(articles):
+            if self.analysis_cache:
+                cache_keys[i] = AnalysisCache.make_key(article, BATCH_ANALYSIS_PROMPT, DEEPSEEK_MODEL)
+                analyses[i] = self.analysis_cache.get(cache_keys[i])
+            if analyses[i] is None:
+                pending.append(i)
+
+        if pending:
+            try:
+                numbered = "\n\n".join(
+                    f"[{n}] {articles[i]['title']}\n{articles[i].get('description', '')}"
+                    for n, i in enumerate(pending, 1)
+                )
+                messages = [
+                    {
+                        'role': 'system',
+                        'content': ANALYSIS_SYSTEM_PROMPT
+                    },
+                    {
+                        'role': 'user',
+                        'content': BATCH_ANALYSIS_PROMPT.format(articles=numbered)
+                    }
+                ]
+
+                response = self.deepseek.chat_completion(
+                    messages,
+                    model=DEEPSEEK_MODEL,
+                    temperature=0.5,
+                    max_tokens=200 * len(pending)
+                )
+
+                if response.status_code == 200:
+                    response_content = response.json()['choices'][0]['message']['content'].strip()
+                    parsed = self._parse_batch_analysis(response_content, len(pending))
+                    for i, analysis in zip(pending, parsed):
+                        if analysis:
+                            analyses[i] = analysis
+                            if cache_keys[i]:
+                                self.analysis_cache.set(cache_keys[i], analysis)
+                else:
+                    print(f"Error from Deepseek API: {response.text}")
+            except Exception as e:
+                print(f"Error analyzing article batch: {e}")
+
+        unmatched = [i for i in pending if analyses[i] is None]
+        if unmatched:
+            print(f"Retrying {len(unmatched)} unmatched article(s) individually")
+            for i in unmatched:
+                analyses[i] = self._analyze_article_safe(articles[i])
+        return analyses
+
+    def _analyze_batch_safe(self, articles):
+        """Analyze a batch, falling back to the default analysis for every article on failure."""
+        try:
+            return self.analyze_articles_batch(articles)
+        except Exception as e:
+            print(f"Error analyzing article batch: {e}")
+            return [dict(DEFAULT_ANALYSIS) for _ in articles]
+
+    @timed('poster_stage', stage='analyze')
+    def analyze_articles(self, articles):
+        """Analyze articles concurrently, returning analyses in the original order."""
+        if not articles:
+            return []
+
+        if self.analysis_batch_size > 1 and len(articles) > 1:
+            size = self.analysis_batch_size
+            batches = [articles[i:i + size] for i in range(0, len(articles), size)]
+            max_workers = min(self.analysis_max_workers, len(batches))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis") as executor:
+                return [analysis for batch in executor.map(self._analyze_batch_safe, batches)
+                        for analysis in batch]
+
+        if len(articles) == 1 or self.analysis_max_workers == 1:
+            return [self._analyze_article_safe(article) for article in articles]
+
+        max_workers = min(self.analysis_max_workers, len(articles))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis") as executor:
+            # map() yields results in submission order regardless of completion order
+            return list(executor.map(self._analyze_article_safe, articles))
+
+    def fetch_candidates(self):
+        """Fetch a deduplicated pool of candidate articles from every source."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.fetch_lock_path)), exist_ok=True)
+        with self._fetch_lock, open(self.fetch_lock_path, 'a') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            articles = stream_articles(self.news_sources, max_workers=self.source_max_workers)
+
+            # Drop incomplete entries and repeated URLs across sources
+            seen_urls = set()
+            candidates = (
+                article for article in articles
+                if article.get('title') and article.get('url')
+                and article['url'] not in seen_urls and not seen_urls.add(article['url'])
+            )
+
+            # Collect the candidate pool; the stream stops fetching once it is full
+            pool = list(islice(candidates, self.candidate_pool_size))
+            articles.close()
+
+            # Advance incremental fetch watermarks, dropping anything a concurrent run already took
+            exhausted = len(pool) < self.candidate_pool_size
+            for source in self.news_sources:
+                pool = source.commit(pool, exhausted=exhausted)
+            return pool
+
+    def rank_candidates(self, pool, k=12):
+        """Yield the best ``k`` candidates that haven't been posted, best first."""
+        # Exclude articles that were already posted with a single batched lookup
+        if self.post_history and pool:
+            posted = self.post_history.posted_urls(article['url'] for article in pool)
+            if posted:
+                log_message(f"Skipping {len(posted)} previously posted articles")
+                pool = [article for article in pool if article['url'] not in posted]
+
+        # Score the pool, filtering out stock market news and prioritizing tech news
+        ranked = self.ranker.top_k(pool, k=k)
+        log_message(f"Ranked {len(pool)} candidate articles")
+
+        # Collapse near-duplicate stories and drop ones posted on earlier days
+        if self.duplicate_index:
+            ranked = self.duplicate_index.filter_new(ranked)
+        return ranked
+
+    @timed('poster_stage', stage='fetch')
+    def select_articles(self):
+        """Fetch, rank and deduplicate news articles, returning the ones to post unanalyzed."""
+        return list(islice(self.rank_candidates(self.fetch_candidates()), 3))
+
+    @timed('poster_stage', stage='ingest')
+    def refresh_ready_pool(self, ready_pool, analyze_top=6):
+        """Fetch new candidates, analyze the best of them and add them to ``ready_pool``.
+
+        Articles whose analysis failed are left out, so a later refresh retries them.
+        """
+        known = ready_pool.urls()
+        fresh = [article for article in self.fetch_candidates() if article['url'] not in known]
+        selected = list(islice(self.rank_candidates(fresh, k=analyze_top * 2), analyze_top))
+        analyzed = [article for article in self.add_analyses(selected) if is_usable_analysis(article['analysis'])]
+        ready_pool.add(analyzed)
+        log_message(f"Ready pool refreshed: {len(analyzed)} new, {len(ready_pool)} ready")
+        return analyzed
+
+    def select_from_pool(self, ready_pool):
+        """Pick the articles to post from the already-analyzed ``ready_pool``."""
+        return list(islice(self.rank_candidates(ready_pool.snapshot()), 3))
+
+    def add_analyses(self, articles):
+        """Add AI analysis to each article, analyzing them in parallel."""
+        for article, analysis in zip(articles, self.analyze_articles(articles)):
+            article['analysis'] = analysis
+        log_message(f"DeepSeek connection stats: {self.deepseek.connection_stats()}")
+        return articles
 
     def fetch_ai_news(self):
         """Fetch the latest AI-related news articles."""
-        url = 'https://newsapi.org/v2/everything'
-        params = {
-            'q': '("artificial intelligence" OR "machine learning" OR "ChatGPT" OR "OpenAI" OR "Google Gemini") AND (technology OR innovation OR research)',
-            'language': 'en',
-            'sortBy': 'publishedAt',
-            'pageSize': 10,
-            'apiKey': self.news_api_key
-        }
-        
         try:
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            articles = response.json()['articles']
-            
-            # Filter out stock market news and prioritize tech news
-            filtered_articles = [
-                article for article in articles
-                if not any(keyword in article['title'].lower() 
-                          for keyword in ['stock', 'nasdaq', 'nyse', 'shares', 'market'])
-            ]
-            
-            # Add AI analysis to each article
-            for article in filtered_articles[:3]:
-                article['analysis'] = self.analyze_article(article)
-            
-            return filtered_articles[:3]
+            return self.add_analyses(self.select_articles())
         except Exception as e:
             print(f"Error fetching news: {e}")
             return []
 
+    @timed('poster_stage', stage='format')
     def format_news_post(self, articles):
         """Format the news articles into a LinkedIn post with AI insights."""
         if not articles:
             return None
             
         try:
-            today = datetime.now().strftime("%B %d, %Y")
-            
-            # Start with an engaging header
-            post_text = f"🤖 AI Innovation Digest - {today}\n\n"
-            post_text += "Today's curated insights on the latest AI developments, analyzed by our AI for busy professionals.\n\n"
-            
-            # Add each article with AI analysis
-            for i, article in enumerate(articles, 1):
-                # Clean up title by removing any line breaks and extra spaces
-                title = ' '.join(article['title'].split(' - ')[0].split())
-                post_text += f"📰 {i}. {title}\n\n"
-                
-                if article.get('analysis'):
-                    # Clean up analysis text and ensure proper line breaks
-                    takeaway = ' '.join(article['analysis']['takeaway'].split())
-                    impact = ' '.join(article['analysis']['impact'].split())
-                    why_matters = ' '.join(article['analysis']['why_matters'].split())
-                    
-                    post_text += f"🔍 Key Takeaway: {takeaway}\n"
-                    post_text += f"💡 Impact: {impact}\n"
-                    post_text += f"💼 Why It Matters: {why_matters}\n"
-                
-                # Clean up URL and ensure it's on its own line
-                url = article['url'].strip()
-                post_text += f"🔗 Read more: {url}\n\n"
-            
-            # Add our service promotion
-            post_text += "-------------------\n"
-            post_text += "🚀 Want AI-powered insights for your LinkedIn presence?\n"
-            post_text += "Check out our AI News Poster service: https://linkedin-ai-news.vercel.app\n"
-            post_text += "Stay ahead of the curve with automated, intelligent content curation.\n\n"
-            
-            # Add relevant hashtags
-            post_text += "#ArtificialIntelligence #AIInnovation #TechNews #FutureOfWork #LinkedInAutomation"
-            
-            return post_text
+            # Header, per-article blocks, promotion footer and hashtags come from the digest template
+            return self.digest_template.render(articles)
         except Exception as e:
             print(f"Error formatting post: {e}")
             return None
 
+    @timed('poster_stage', stage='post')
     def post_to_linkedin(self, content):
         """Post the formatted content to LinkedIn."""
         if not content:
@@ -214,32 +556,13 @@ Article to analyze:
         log_message("Attempting to post to LinkedIn...")
         log_message(f"Using LinkedIn ID: {self.linkedin_id}")
         
-        post_data = {
-            "author": f"urn:li:person:{self.linkedin_id}",
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {
-                        "text": content
-                    },
-                    "shareMediaCategory": "NONE"
-                }
-            },
-            "visibility": {
-                "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
-            }
-        }
-
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json',
-            'X-Restli-Protocol-Version': '2.0.0'
-        }
+        post_data = build_ugc_post(person_urn(self.linkedin_id), content)
+        headers = linkedin_headers(self.access_token)
 
         try:
             log_message("Sending POST request to LinkedIn API...")
             response = self.session.post(
-                'https://api.linkedin.com/v2/ugcPosts',
+                f'{LINKEDIN_API_URL}/ugcPosts',
                 json=post_data,
                 headers=headers,
                 timeout=10
@@ -249,6 +572,7 @@ Article to analyze:
             log_message(f"LinkedIn API Response: {response.text}")
             
             response.raise_for_status()
+            self.last_post_id = extract_post_id(response)
             return True
             
         except requests.exceptions.RequestException as e:
@@ -256,26 +580,166 @@ Article to analyze:
             log_message(f"Response content: {getattr(e.response, 'text', 'No response content')}", "ERROR")
             return False
 
-    def run(self):
-        """Run the news posting process."""
+    def publish_to_accounts(self, content, targets):
+        """Publish the digest to additional LinkedIn accounts and return a per-target report."""
+        publisher = FanoutPublisher(
+            max_concurrency=int(os.getenv('FANOUT_MAX_CONCURRENCY', '20')),
+            per_account_limit=int(os.getenv('FANOUT_PER_ACCOUNT_LIMIT', '1'))
+        )
+        results = publisher.publish(targets, content)
+        summary = FanoutPublisher.summarize(results)
+        log_message(f"Fan-out publishing: {summary['succeeded']}/{summary['total']} succeeded "
+                    f"in {summary['max_elapsed']:.2f}s slowest")
+        for result in results:
+            if not result['success']:
+                log_message(f"Fan-out to {result['person_id']} failed: {result['error']}", "ERROR")
+        return results
+
+    def enqueue_fanout(self, content, targets_file):
+        """Queue one publish job per fan-out target, so one account failing never touches the others.
+
+        The publisher already resends 429s and connection errors; any other
+        failure (a 5xx, a read timeout) may have created the post, so a job
+        gets one attempt and a failure is dead-lettered for a manual requeue.
+        """
+        for target in load_targets(targets_file):
+            self.fanout_queue.enqueue(
+                'publish_to_account',
+                {'content': content, 'targets_file': targets_file, 'person_id': target['person_id']},
+                max_attempts=1,
+                dedupe_key=f"publish_to_account:{self.run_id}:{target['person_id']}"
+            )
+        log_message(f"Queued fan-out publishing for run {self.run_id}")
+
+    def _log_cache_stats(self):
+        """Log the analysis cache hit rate, so a cache that stops hitting is noticed."""
+        if self.analysis_cache:
+            try:
+                log_message(f"Analysis cache stats: {self.analysis_cache.stats()}")
+            except Exception as e:
+                log_message(f"Failed to read analysis cache stats: {e}", "WARNING")
+
+    def _checkpoint(self, checkpoint, stage, value):
+        """Persist a completed stage; a failed write only costs the ability to resume."""
+        if self.checkpoints and self.run_id:
+            try:
+                self.checkpoints.save(self.run_id, stage, checkpoint, value)
+            except Exception as e:
+                log_message(f"Failed to save {stage} checkpoint: {e}", "WARNING")
+
+    def _start_run(self, resume, run_id=None):
+        """Pick the run ID and load its checkpoint.
+
+        ``run_id`` names the run outright, starting it if it has no checkpoint
+        yet, so a retried job continues the same run. ``resume='latest'``
+        picks the newest unfinished run.
+        """
+        if run_id:
+            self.run_id = run_id
+            return (self.checkpoints.load(run_id) if self.checkpoints else None) or {}
+        checkpoint = {}
+        if resume and self.checkpoints:
+            if resume == 'latest':
+                resume = self.checkpoints.latest_incomplete()
+            if resume:
+                checkpoint = self.checkpoints.load(resume)
+                if checkpoint is None:
+                    log_message(f"No checkpoint for run {resume}, starting a new run", "WARNING")
+                    checkpoint, resume = {}, None
+        elif resume:
+            log_message("Run checkpoints are disabled, starting a new run", "WARNING")
+            resume = None
+        self.run_id = resume or CheckpointStore.new_run_id()
+        return checkpoint
+
+    def _after_post(self, post_content, articles, ready_pool):
+        """Bookkeeping and fan-out once the post is live; failures are logged, never raised."""
+        if ready_pool is not None:
+            try:
+                ready_pool.remove(article['url'] for article in articles)
+            except Exception as e:
+                log_message(f"Failed to remove posted articles from the ready pool: {e}", "WARNING")
+        if self.duplicate_index:
+            try:
+                self.duplicate_index.record(articles)
+            except Exception as e:
+                log_message(f"Failed to record posted stories: {e}", "WARNING")
+        if self.post_history:
+            try:
+                self.post_history.record_post(
+                    post_content, articles, linkedin_post_id=self.last_post_id, author=self.linkedin_id
+                )
+            except Exception as e:
+                log_message(f"Failed to record post history: {e}", "WARNING")
+
+        # Publish to any additional accounts configured for fan-out
+        targets_file = os.getenv('LINKEDIN_TARGETS_FILE')
+        try:
+            if targets_file and self.fanout_queue is not None:
+                self.enqueue_fanout(post_content, targets_file)
+            elif targets_file:
+                self.publish_to_accounts(post_content, load_targets(targets_file))
+        except Exception as e:
+            log_message(f"Failed to publish to fan-out accounts: {e}", "WARNING")
+
+    @timed('poster_stage', stage='run')
+    def run(self, resume=None, ready_pool=None, run_id=None):
+        """Run the news posting process, optionally resuming a failed run by ID.
+
+        With a ``ready_pool`` the articles come pre-analyzed from the pool, and
+        the run only fetches and analyzes when the pool has nothing to post.
+        A ``run_id`` starts or continues exactly that run; see ``_start_run``.
+        """
         try:
-            log_message("Starting news posting process...")
+            checkpoint = self._start_run(resume, run_id)
+            completed = checkpoint.get('completed', [])
+            if completed:
+                log_message(f"Resuming run {self.run_id} after stages: {', '.join(completed)}")
+            else:
+                log_message(f"Starting news posting process (run {self.run_id})...")
+            if 'posted' in completed:
+                log_message("Run already posted, nothing to do")
+                return True
             
+            # Take pre-analyzed articles from the ready pool when one is kept
+            articles = checkpoint.get('analyzed')
+            if articles is None and ready_pool is not None:
+                articles = self.select_from_pool(ready_pool) or None
+                if articles:
+                    log_message(f"Selected {len(articles)} articles from the ready pool")
+                    self._checkpoint(checkpoint, 'analyzed', articles)
+                else:
+                    log_message("Ready pool is empty, fetching articles now", "WARNING")
+
             # Fetch news articles
-            log_message("Fetching AI news articles...")
-            articles = self.fetch_ai_news()
-            if not articles:
-                log_message("No articles found", "ERROR")
-                return False
-            log_message(f"Found {len(articles)} articles")
+            if articles is None:
+                articles = checkpoint.get('fetched')
+                if articles is None:
+                    log_message("Fetching AI news articles...")
+                    try:
+                        articles = self.select_articles()
+                    except Exception as e:
+                        log_message(f"Error fetching news: {e}", "ERROR")
+                        articles = []
+                    if not articles:
+                        log_message("No articles found", "ERROR")
+                        return False
+                    self._checkpoint(checkpoint, 'fetched', articles)
+                log_message(f"Found {len(articles)} articles")
+                
+                articles = self.add_analyses(articles)
+                self._checkpoint(checkpoint, 'analyzed', articles)
             
             # Format the post
-            log_message("Formatting news post...")
-            post_content = self.format_news_post(articles)
-            if not post_content:
-                log_message("Failed to format post content", "ERROR")
-                return False
-            log_message("Post content formatted successfully")
+            post_content = checkpoint.get('formatted')
+            if post_content is None:
+                log_message("Formatting news post...")
+                post_content = self.format_news_post(articles)
+                if not post_content:
+                    log_message("Failed to format post content", "ERROR")
+                    return False
+                self._checkpoint(checkpoint, 'formatted', post_content)
+                log_message("Post content formatted successfully")
             
             # Post to LinkedIn
             log_message("Posting to LinkedIn...")
@@ -283,19 +747,29 @@ Article to analyze:
             
             if success:
                 log_message("Successfully posted to LinkedIn!")
+                self._checkpoint(checkpoint, 'posted', {'linkedin_post_id': self.last_post_id})
+                # The post is live; a retry must not post it again, so the run counts as done
+                self._after_post(post_content, articles, ready_pool)
                 return True
             else:
-                log_message("Failed to post to LinkedIn", "ERROR")
+                log_message(f"Failed to post to LinkedIn; resume with --resume {self.run_id}", "ERROR")
                 return False
                 
         except Exception as e:
             log_message(f"Unexpected error: {str(e)}", "ERROR")
             return False
+        finally:
+            self._log_cache_stats()
 
 if __name__ == "__main__":
     try:
+        # --resume RUN_ID (or "latest") continues a failed run from its last completed stage
+        resume = os.getenv('RESUME_RUN_ID') or None
+        if '--resume' in sys.argv[1:]:
+            index = sys.argv.index('--resume')
+            resume = sys.argv[index + 1] if index + 1 < len(sys.argv) else 'latest'
         poster = AINewsPoster()
-        success = poster.run()
+        success = poster.run(resume=resume)
         if not success:
             log_message("Script completed with errors", "ERROR")
             sys.exit(1)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class AnalysisCache:
+    """On-disk cache of DeepSeek article analyses.
+
+    Entries are keyed by a hash of the article content, prompt and model,
+    expire after ``ttl_seconds`` and are evicted least-recently-used once the
+    cache holds more than ``max_entries``. The cache lives in a SQLite
+    database in WAL mode so several processes can share it safely.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 5000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_last_access ON analyses (last_access)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO stats (name, value) VALUES ('hits', 0), ('misses', 0)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(article: Dict, prompt: str, model: str) -> str:
+        """Build the content-addressed key for an article analysis."""
+        payload = json.dumps([
+            article.get('url') or '',
+            article.get('title') or '',
+            article.get('description') or '',
+            prompt,
+            model,
+        ], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _count(self, conn: sqlite3.Connection, name: str):
+        conn.execute("UPDATE stats SET value = value + 1 WHERE name = ?", (name,))
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached analysis for ``key``, or None on a miss."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM analyses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count(conn, 'misses')
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM analyses WHERE key = ?", (key,))
+                self._count(conn, 'misses')
+                return None
+            conn.execute("UPDATE analyses SET last_access = ? WHERE key = ?", (now, key))
+            self._count(conn, 'hits')
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict):
+        """Store an analysis and evict expired or least-recently-used entries."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            conn.execute("DELETE FROM analyses WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute("""
+                DELETE FROM analyses WHERE key IN (
+                    SELECT key FROM analyses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current number of entries."""
+        conn = self._connect()
+        counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+        entries = conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        return {
+            'hits': counters.get('hits', 0),
+            'misses': counters.get('misses', 0),
+            'entries': entries,
+        }
+
+    def clear(self):
+        """Remove all cached analyses and reset the counters."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM analyses")
+            conn.execute("UPDATE stats SET value = 0")
@@ -3,9 +3,10 @@ from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 import json
-import requests
 from datetime import datetime
 from database import Database
+from deepseek_client import get_deepseek_client
+from metrics import instrument_flask
 from functools import wraps
 
 # Force reload environment variables
@@ -20,6 +21,7 @@ else:
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 CORS(app)
+instrument_flask(app)
 
 # Initialize database with environment variables
 db = Database()
@@ -125,31 +127,22 @@ def chat():
         Respond in a helpful and engaging way, focusing on AI news, technology trends, and professional development.
         Keep responses under 200 words."""
         
-        headers = {
-            'Authorization': f'Bearer {DEEPSEEK_API_KEY}',
-            'Content-Type': 'application/json'
-        }
+        messages = [
+            {
+                'role': 'system',
+                'content': 'You are a helpful AI assistant for LinkedIn AI News Poster. Be professional and concise.'
+            },
+            {
+                'role': 'user',
+                'content': prompt
+            }
+        ]
         
-        data = {
-            'messages': [
-                {
-                    'role': 'system',
-                    'content': 'You are a helpful AI assistant for LinkedIn AI News Poster. Be professional and concise.'
-                },
-                {
-                    'role': 'user',
-                    'content': prompt
-                }
-            ],
-            'model': 'deepseek-chat',
-            'temperature': 0.7,
-            'max_tokens': 200
-        }
-        
-        response = requests.post(
-            'https://api.deepseek.com/v1/chat/completions',
-            json=data,
-            headers=headers
+        response = get_deepseek_client(DEEPSEEK_API_KEY).chat_completion(
+            messages,
+            model='deepseek-chat',
+            temperature=0.7,
+            max_tokens=200
         )
         
         print(f"DeepSeek API Response Status: {response.status_code}")
@@ -178,7 +171,10 @@ def chat():
 @requires_auth
 def admin_dashboard():
     users = db.get_all_users()
-    user_count = db.get_user_count()
+    # Counters come from one small blob, so the records are only downloaded once
+    counters = db.get_user_counters() or {'total': 0, 'daily': {}}
+    user_count = counters['total']
+    daily_counts = sorted(counters['daily'].items(), reverse=True)[:7]
     
     # Simple HTML template for the dashboard
     dashboard_html = """
@@ -199,6 +195,9 @@ def admin_dashboard():
         <h1>Admin Dashboard</h1>
         <div class="stats">
             <h2>Total Registrations: <span class="count">{{ user_count }}</span></h2>
+            {% for day, count in daily_counts %}
+            <div>{{ day }}: {{ count }}</div>
+            {% endfor %}
         </div>
         <h2>Recent Registrations</h2>
         <table>
@@ -220,7 +219,8 @@ def admin_dashboard():
     </body>
     </html>
     """
-    return render_template_string(dashboard_html, users=users, user_count=user_count)
+    return render_template_string(dashboard_html, users=users, user_count=user_count,
+                                  daily_counts=daily_counts)
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,177 @@
+import heapq
+import math
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Include lexicon: term -> weight
+DEFAULT_INCLUDE_TERMS = {
+    'artificial intelligence': 3.0,
+    'machine learning': 2.5,
+    'deep learning': 2.5,
+    'generative ai': 2.5,
+    'large language model': 2.5,
+    'llm': 2.0,
+    'chatgpt': 2.0,
+    'openai': 2.0,
+    'gemini': 1.5,
+    'anthropic': 1.5,
+    'claude': 1.5,
+    'neural network': 2.0,
+    'model': 0.5,
+    'research': 1.0,
+    'breakthrough': 1.0,
+    'innovation': 1.0,
+    'open source': 1.0,
+    'robotics': 1.0,
+    'ai': 1.0,
+}
+
+# Exclude lexicon: any match in the title drops the article
+DEFAULT_EXCLUDE_TERMS = [
+    'stock', 'stocks', 'nasdaq', 'nyse', 'shares', 'market', 'investors',
+    'earnings', 'price target', 'dividend', 'buy rating', 'sell rating',
+]
+
+
+class AhoCorasick:
+    """Multi-pattern matcher that finds every lexicon term in one pass over the text.
+
+    Matches are restricted to whole words so that e.g. ``ai`` does not match
+    inside ``said``.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for pattern in patterns:
+            self._add(pattern.lower())
+        self._build()
+
+    def _add(self, pattern: str):
+        index = len(self.patterns)
+        self.patterns.append(pattern)
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(index)
+
+    def _build(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def count(self, text: str) -> List[int]:
+        """Return the number of whole-word occurrences of each pattern in ``text``."""
+        counts = [0] * len(self.patterns)
+        text = text.lower()
+        length = len(text)
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._output[state]:
+                end = position + 1
+                start = end - len(self.patterns[index])
+                if (start == 0 or not text[start - 1].isalnum()) and (end == length or not text[end].isalnum()):
+                    counts[index] += 1
+        return counts
+
+    def matches(self, text: str) -> bool:
+        return any(self.count(text))
+
+
+def _parse_published_at(value: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            from email.utils import parsedate_to_datetime
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class ArticleRanker:
+    """Scores candidate articles and selects the top-k.
+
+    Each article's score is the TF-IDF weighted sum of its include-lexicon
+    matches (title hits count double), multiplied by an exponential recency
+    decay with a ``half_life_hours`` half-life. Articles whose title matches
+    the exclude lexicon are dropped before scoring.
+    """
+
+    def __init__(self, include_terms: Dict[str, float] = None, exclude_terms: Iterable[str] = None,
+                 half_life_hours: float = 24.0, title_weight: float = 2.0):
+        include_terms = include_terms or DEFAULT_INCLUDE_TERMS
+        self.terms = list(include_terms)
+        self.weights = [include_terms[term] for term in self.terms]
+        self.include = AhoCorasick(self.terms)
+        self.exclude = AhoCorasick(exclude_terms if exclude_terms is not None else DEFAULT_EXCLUDE_TERMS)
+        self.decay_rate = math.log(2) / half_life_hours
+        self.title_weight = title_weight
+
+    def _term_counts(self, article: Dict) -> List[float]:
+        title_counts = self.include.count(article.get('title') or '')
+        body_counts = self.include.count(article.get('description') or '')
+        return [self.title_weight * t + b for t, b in zip(title_counts, body_counts)]
+
+    def score(self, articles: List[Dict], now: datetime = None) -> List[Tuple[float, Dict]]:
+        """Return (score, article) pairs for every article that passes the exclude lexicon."""
+        now = now or datetime.now(timezone.utc)
+        candidates = [a for a in articles if a.get('title') and not self.exclude.matches(a['title'])]
+        if not candidates:
+            return []
+
+        matrix = [self._term_counts(article) for article in candidates]
+
+        # Inverse document frequency of each term across the candidate pool
+        total = len(candidates)
+        document_frequency = [sum(1 for row in matrix if row[i]) for i in range(len(self.terms))]
+        term_weights = [
+            weight * (math.log((1 + total) / (1 + df)) + 1.0)
+            for weight, df in zip(self.weights, document_frequency)
+        ]
+
+        scored = []
+        for article, row in zip(candidates, matrix):
+            relevance = sum(
+                (1.0 + math.log(count)) * weight
+                for count, weight in zip(row, term_weights) if count
+            )
+            published = _parse_published_at(article.get('publishedAt'))
+            age_hours = max(0.0, (now - published).total_seconds() / 3600) if published else 0.0
+            scored.append((relevance * math.exp(-self.decay_rate * age_hours), article))
+        return scored
+
+    def top_k(self, articles: Iterable[Dict], k: int = 3, now: datetime = None) -> List[Dict]:
+        """Return the ``k`` highest-scoring relevant articles, best first."""
+        scored = self.score(list(articles), now=now)
+        # Ties keep their original order so results are deterministic
+        best = heapq.nlargest(k, ((score, -i, article) for i, (score, article) in enumerate(scored) if score > 0),
+                              key=lambda item: (item[0], item[1]))
+        return [article for _, _, article in best]
@@ -0,0 +1,98 @@
+"""Micro-benchmark: compiled digest templates versus the original string concatenation.
+
+A single DigestTemplate.render is slower than the concatenation, since it
+prepares the digest for one use; the gain comes from render_many sharing
+that work across accounts.
+
+Usage:
+    python benchmarks/bench_templates.py --accounts 5000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from digest_templates import DEFAULT_TEMPLATE, DigestTemplate  # noqa: E402
+
+
+def legacy_format_news_post(articles, today):
+    """The pre-template AINewsPoster.format_news_post, kept for comparison."""
+    post_text = f"🤖 AI Innovation Digest - {today}\n\n"
+    post_text += "Today's curated insights on the latest AI developments, analyzed by our AI for busy professionals.\n\n"
+    for i, article in enumerate(articles, 1):
+        title = ' '.join(article['title'].split(' - ')[0].split())
+        post_text += f"📰 {i}. {title}\n\n"
+        if article.get('analysis'):
+            takeaway = ' '.join(article['analysis']['takeaway'].split())
+            impact = ' '.join(article['analysis']['impact'].split())
+            why_matters = ' '.join(article['analysis']['why_matters'].split())
+            post_text += f"🔍 Key Takeaway: {takeaway}\n"
+            post_text += f"💡 Impact: {impact}\n"
+            post_text += f"💼 Why It Matters: {why_matters}\n"
+        url = article['url'].strip()
+        post_text += f"🔗 Read more: {url}\n\n"
+    post_text += "-------------------\n"
+    post_text += "🚀 Want AI-powered insights for your LinkedIn presence?\n"
+    post_text += "Check out our AI News Poster service: https://linkedin-ai-news.vercel.app\n"
+    post_text += "Stay ahead of the curve with automated, intelligent content curation.\n\n"
+    post_text += "#ArtificialIntelligence #AIInnovation #TechNews #FutureOfWork #LinkedInAutomation"
+    return post_text
+
+
+def sample_articles(count=3):
+    return [{
+        'title': f"New open model {i} tops reasoning benchmarks - Example News",
+        'url': f"https://news.example.com/articles/{i} ",
+        'analysis': {
+            'takeaway': f"Model {i} sets a new state of the art on reasoning benchmarks.",
+            'impact': "Open models are closing the gap with proprietary systems.",
+            'why_matters': "Teams can adopt capable models without vendor lock-in.",
+        }
+    } for i in range(1, count + 1)]
+
+
+def measure(label, func, renders):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:45} {renders / elapsed:>12,.0f} renders/s  ({elapsed * 1000:.1f} ms)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--accounts', type=int, default=5000)
+    parser.add_argument('--articles', type=int, default=3)
+    args = parser.parse_args()
+
+    articles = sample_articles(args.articles)
+    now = datetime.now()
+    today = now.strftime("%B %d, %Y")
+
+    # The default template must reproduce the original post exactly
+    assert DEFAULT_TEMPLATE.render(articles, date=now) == legacy_format_news_post(articles, today)
+
+    personalized = DigestTemplate({
+        'header': "🤖 AI Innovation Digest for {first_name} - {date}\n\n",
+        'footer': "-------------------\nCurated for {company} by AI News Poster: {promo_url}\n\n",
+    })
+    accounts = [{'first_name': f"User{i}", 'company': f"Company {i % 97}"} for i in range(args.accounts)]
+
+    print(f"{args.accounts} renders of a {args.articles}-article digest\n")
+    legacy = measure("legacy format_news_post (same digest)",
+                     lambda: [legacy_format_news_post(articles, today) for _ in accounts], args.accounts)
+    compiled = measure("DigestTemplate.render (same digest)",
+                       lambda: [DEFAULT_TEMPLATE.render(articles, date=now) for _ in accounts], args.accounts)
+    shared = measure("DigestTemplate.render_many (same digest)",
+                     lambda: DEFAULT_TEMPLATE.render_many(articles, [{}] * len(accounts), date=now), args.accounts)
+    personal = measure("DigestTemplate.render_many (personalized)",
+                       lambda: personalized.render_many(articles, accounts, date=now), args.accounts)
+    print(f"\nsingle render vs legacy: {legacy / compiled:.1f}x")
+    print(f"render_many speedup over legacy: {legacy / shared:.1f}x (personalized: {legacy / personal:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
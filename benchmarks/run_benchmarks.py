@@ -0,0 +1,285 @@
+"""End-to-end benchmarks against local stub upstreams.
+
+Starts stand-ins for NewsAPI, DeepSeek, LinkedIn and Vercel Blob, points
+the application at them and drives AINewsPoster, Database and both Flask
+apps through scripted scenarios. Reports throughput and p50/p95/p99
+latency per stage and writes the results as JSON that later runs can be
+compared against.
+
+Usage:
+    python benchmarks/run_benchmarks.py --iterations 20 --users 50 \\
+        --latency deepseek=300 --latency newsapi=80 --error-rate linkedin=0.05 \\
+        --output benchmarks/results/latest.json --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_servers import start_all  # noqa: E402
+
+
+class LatencyRecorder:
+    """Collects per-stage latencies and summarizes them."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.wall = {}
+
+    def record(self, stage, seconds, ok=True):
+        self.samples.setdefault(stage, []).append(seconds)
+        if not ok:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        started = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except Exception:
+            ok = False
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - started, ok)
+
+    @contextlib.contextmanager
+    def scenario(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.wall[name] = time.perf_counter() - started
+
+    def timed(self, stage, func):
+        def wrapper(*args, **kwargs):
+            with self.measure(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+    @staticmethod
+    def percentile(sorted_samples, pct):
+        if not sorted_samples:
+            return 0.0
+        rank = max(0, min(len(sorted_samples) - 1, int(round(pct / 100 * len(sorted_samples) + 0.5)) - 1))
+        return sorted_samples[rank]
+
+    def summary(self):
+        stages = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            total = sum(ordered)
+            stages[stage] = {
+                'count': len(ordered),
+                'errors': self.errors.get(stage, 0),
+                'total_s': round(total, 4),
+                'throughput_per_s': round(len(ordered) / total, 2) if total else None,
+                'mean_ms': round(total / len(ordered) * 1000, 3),
+                'p50_ms': round(self.percentile(ordered, 50) * 1000, 3),
+                'p95_ms': round(self.percentile(ordered, 95) * 1000, 3),
+                'p99_ms': round(self.percentile(ordered, 99) * 1000, 3),
+            }
+        return stages
+
+
+def configure_environment(stubs, workdir):
+    """Point every client at the stubs and keep local state in ``workdir``."""
+    os.environ.update({
+        'NEWS_API_URL': f"{stubs['newsapi'].url}/v2",
+        'DEEPSEEK_API_URL': f"{stubs['deepseek'].url}/v1",
+        'LINKEDIN_API_URL': f"{stubs['linkedin'].url}/v2",
+        'BLOB_API_URL': stubs['blob'].url,
+        'BLOB_READ_WRITE_TOKEN': 'vercel_blob_rw_benchstore_token',
+        'NEWS_API_KEY': 'bench-news-key',
+        'DEEPSEEK_API_KEY': 'bench-deepseek-key',
+        'LINKEDIN_ACCESS_TOKEN': 'bench-linkedin-token',
+        'LINKEDIN_PERSON_ID': 'bench-person',
+        'ANALYSIS_CACHE_ENABLED': 'false',
+        'RATE_LIMIT_ENABLED': 'false',
+        'HTTP_TRANSPORT_MODE': '',
+        'DEEPSEEK_MAX_RETRIES': '0',
+        'DUPLICATE_INDEX_PATH': os.path.join(workdir, 'duplicate_index.db'),
+        'POST_HISTORY_PATH': os.path.join(workdir, 'post_history.db'),
+        'CHECKPOINT_DIR': os.path.join(workdir, 'checkpoints'),
+        'USER_INDEX_SHARED_DIR': workdir,
+    })
+
+
+@contextlib.contextmanager
+def quiet(enabled):
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_poster(recorder, iterations):
+    from ai_news_poster import AINewsPoster
+
+    poster = AINewsPoster()
+    for stage in ('select_articles', 'add_analyses', 'analyze_articles', 'format_news_post', 'post_to_linkedin'):
+        setattr(poster, stage, recorder.timed(f"poster.{stage}", getattr(poster, stage)))
+
+    with recorder.scenario('poster'):
+        for _ in range(iterations):
+            with recorder.measure('poster.run'):
+                if not poster.run():
+                    recorder.errors['poster.run'] = recorder.errors.get('poster.run', 0) + 1
+
+
+def bench_database(recorder, users):
+    from database import Database
+
+    db = Database()
+    emails = [f"bench-db-{i}@example.com" for i in range(users)]
+    with recorder.scenario('database'):
+        for i, email in enumerate(emails):
+            with recorder.measure('database.add_user'):
+                db.add_user(f"Bench User {i}", email)
+        for email in emails:
+            with recorder.measure('database.user_exists.hit'):
+                db.user_exists(email)
+        for i in range(users):
+            with recorder.measure('database.user_exists.miss'):
+                db.user_exists(f"unknown-{i}@example.com")
+        for _ in range(3):
+            with recorder.measure('database.get_all_users'):
+                db.get_all_users()
+            with recorder.measure('database.get_user_count'):
+                db.get_user_count()
+
+
+def bench_flask_app(recorder, module_name, requests_count):
+    module = importlib.import_module(module_name)
+    client = module.app.test_client()
+    prefix = f"{module_name}"
+
+    def call(stage, method, path, **kwargs):
+        with recorder.measure(stage):
+            response = getattr(client, method)(path, **kwargs)
+        if response.status_code >= 500:
+            recorder.errors[stage] = recorder.errors.get(stage, 0) + 1
+        return response
+
+    with recorder.scenario(prefix):
+        emails = [f"bench-{module_name}-{i}@example.com" for i in range(requests_count)]
+        for i, email in enumerate(emails):
+            call(f"{prefix}./api/register", 'post', '/api/register', json={'name': f"User {i}", 'email': email})
+        for email in emails:
+            call(f"{prefix}./api/chat", 'post', '/api/chat', json={'email': email, 'message': 'What is new in AI?'})
+        for i in range(requests_count):
+            call(f"{prefix}./api/chat.unregistered", 'post', '/api/chat',
+                 json={'email': f"nobody-{i}@example.com", 'message': 'Hi'})
+        if module_name == 'vercel_app':
+            for _ in range(5):
+                call(f"{prefix}./api/user-count", 'get', '/api/user-count')
+                call(f"{prefix}./api/users", 'get', '/api/users')
+
+
+def compare(results, baseline):
+    """Print p50/p95 changes against a previous results file."""
+    print("\nComparison with baseline:")
+    print(f"{'stage':45} {'p50 ms':>18} {'p95 ms':>18}")
+    for stage, current in sorted(results['stages'].items()):
+        previous = baseline.get('stages', {}).get(stage)
+        if not previous:
+            print(f"{stage:45} {'(new)':>18}")
+            continue
+
+        def delta(key):
+            before, after = previous[key], current[key]
+            change = ((after - before) / before * 100) if before else 0.0
+            return f"{after:.1f} ({change:+.0f}%)"
+        print(f"{stage:45} {delta('p50_ms'):>18} {delta('p95_ms'):>18}")
+
+
+def parse_pairs(values, cast=float):
+    pairs = {}
+    for value in values or []:
+        name, _, amount = value.partition('=')
+        pairs[name.strip()] = cast(amount)
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=10, help='AINewsPoster.run iterations')
+    parser.add_argument('--users', type=int, default=25, help='users per database and Flask scenario')
+    parser.add_argument('--latency', action='append', help='stub latency in ms, e.g. deepseek=300')
+    parser.add_argument('--error-rate', action='append', help='stub error rate, e.g. linkedin=0.05')
+    parser.add_argument('--scenario', action='append', choices=['poster', 'database', 'app', 'vercel_app'],
+                        help='scenarios to run (default: all)')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results', 'latest.json'))
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--verbose', action='store_true', help='show application output')
+    args = parser.parse_args()
+
+    latency = parse_pairs(args.latency)
+    error_rate = parse_pairs(args.error_rate)
+    scenarios = args.scenario or ['poster', 'database', 'app', 'vercel_app']
+
+    stubs = start_all(latency, error_rate)
+    workdir = tempfile.mkdtemp(prefix='linkedin-ai-news-bench-')
+    configure_environment(stubs, workdir)
+    # Run from a scratch directory so the apps do not pick up a developer .env
+    os.chdir(workdir)
+
+    recorder = LatencyRecorder()
+    try:
+        with quiet(not args.verbose):
+            if 'poster' in scenarios:
+                bench_poster(recorder, args.iterations)
+            if 'database' in scenarios:
+                bench_database(recorder, args.users)
+            for module_name in ('app', 'vercel_app'):
+                if module_name in scenarios:
+                    bench_flask_app(recorder, module_name, args.users)
+    finally:
+        for stub in stubs.values():
+            stub.stop()
+
+    results = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'config': {
+            'iterations': args.iterations,
+            'users': args.users,
+            'latency_ms': latency,
+            'error_rate': error_rate,
+            'scenarios': scenarios,
+        },
+        'upstream_requests': {name: stub.requests for name, stub in stubs.items()},
+        'scenario_wall_s': {name: round(seconds, 4) for name, seconds in recorder.wall.items()},
+        'stages': recorder.summary(),
+    }
+
+    print(f"{'stage':45} {'count':>6} {'err':>4} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, stats in sorted(results['stages'].items()):
+        print(f"{stage:45} {stats['count']:>6} {stats['errors']:>4} {stats['throughput_per_s'] or 0:>9} "
+              f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
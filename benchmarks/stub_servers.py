@@ -0,0 +1,215 @@
+"""Local stand-ins for NewsAPI, DeepSeek, the LinkedIn ugcPosts API and Vercel Blob.
+
+Each stub runs a threaded HTTP server on 127.0.0.1 with a configurable
+per-request latency (in milliseconds) and error rate, so benchmarks can
+drive the real code paths without touching the network.
+"""
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "openai google anthropic meta nvidia microsoft model agent robotics chip research "
+    "breakthrough launch open source reasoning vision speech healthcare education startup "
+    "funding regulation safety benchmark dataset training inference cloud edge quantum "
+    "language multimodal assistant coding search privacy policy europe china lab"
+).split()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status, payload=None, headers=None, raw=None):
+        body = raw if raw is not None else json.dumps(payload or {}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        stub = self.server.stub
+        body = self._body()
+        if stub.latency_ms:
+            time.sleep(stub.latency_ms / 1000)
+        with stub.lock:
+            stub.requests += 1
+            fail = stub.random.random() < stub.error_rate
+        if fail:
+            self._send(503, {'error': 'injected failure'})
+            return
+        stub.handle(self, method, body)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+
+class StubServer:
+    """Base class: subclasses implement ``handle(handler, method, body)``."""
+
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, handler, method, body):
+        raise NotImplementedError
+
+
+class NewsAPIStub(StubServer):
+    """Serves /v2/everything with fresh, distinct articles on every request."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._ids = itertools.count()
+
+    def handle(self, handler, method, body):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(handler.path).query)
+        page_size = int(query.get('pageSize', ['10'])[0])
+        now = datetime.now(timezone.utc)
+        articles = []
+        with self.lock:
+            for _ in range(page_size):
+                article_id = next(self._ids)
+                words = self.random.sample(WORDS, 12)
+                articles.append({
+                    'source': {'name': 'Stub News'},
+                    'title': f"{' '.join(words[:7]).capitalize()} {article_id} - Stub News",
+                    'description': f"AI {' '.join(words[5:])} story {article_id} about machine learning research.",
+                    'url': f"https://news.example.com/articles/{article_id}",
+                    'publishedAt': (now - timedelta(minutes=article_id % 600)).strftime('%Y-%m-%dT%H:%M:%SZ')
+                })
+        handler._send(200, {'status': 'ok', 'totalResults': len(articles), 'articles': articles})
+
+
+class DeepSeekStub(StubServer):
+    """Answers chat completions in the single- or batch-analysis format."""
+
+    def handle(self, handler, method, body):
+        request = json.loads(body or b'{}')
+        prompt = request.get('messages', [{}])[-1].get('content', '')
+        numbers = re.findall(r'^\[(\d+)\]', prompt, re.MULTILINE)
+        line = "Stub takeaway sentence | Stub impact sentence | Stub why it matters sentence for professionals."
+        if numbers:
+            content = "\n".join(f"[{n}] {line}" for n in numbers)
+        else:
+            content = line
+        if request.get('stream'):
+            # Stream word by word, with trailing tokens a client can skip
+            tokens = (content + " Trailing commentary that is never needed.").split(' ')
+            events = [
+                'data: ' + json.dumps({'choices': [{'index': 0, 'delta': {'content': token + ' '}}]}) + '\n\n'
+                for token in tokens
+            ]
+            events.append('data: [DONE]\n\n')
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/event-stream')
+            handler.send_header('Content-Length', str(sum(len(e.encode('utf-8')) for e in events)))
+            handler.end_headers()
+            for event in events:
+                handler.wfile.write(event.encode('utf-8'))
+                handler.wfile.flush()
+            return
+        handler._send(200, {
+            'id': 'stub',
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}]
+        })
+
+
+class LinkedInStub(StubServer):
+    """Accepts ugcPosts and returns a post URN."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._ids = itertools.count(1)
+
+    def handle(self, handler, method, body):
+        with self.lock:
+            post_id = f"urn:li:share:{next(self._ids)}"
+        handler._send(201, {'id': post_id}, headers={'x-restli-id': post_id})
+
+
+class BlobStub(StubServer):
+    """In-memory Vercel Blob: PUT stores a JSON document, GET returns it with an ETag."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blobs = {}
+
+    def handle(self, handler, method, body):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(handler.path).path).lstrip('/')
+        if method == 'PUT':
+            with self.lock:
+                self.blobs[path] = body
+            handler._send(200, {'url': f"{self.url}/{urllib.parse.quote(path)}", 'pathname': path})
+            return
+        with self.lock:
+            stored = self.blobs.get(path)
+        if stored is None:
+            handler._send(404, {'error': 'not found'})
+            return
+        etag = '"' + hashlib.sha1(stored).hexdigest() + '"'
+        if handler.headers.get('If-None-Match') == etag:
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+        else:
+            handler._send(200, headers={'ETag': etag}, raw=stored)
+
+
+def start_all(latency_ms=None, error_rate=None):
+    """Start one stub per upstream. ``latency_ms``/``error_rate`` are dicts keyed by stub name."""
+    latency_ms = latency_ms or {}
+    error_rate = error_rate or {}
+    stubs = {
+        'newsapi': NewsAPIStub,
+        'deepseek': DeepSeekStub,
+        'linkedin': LinkedInStub,
+        'blob': BlobStub,
+    }
+    return {
+        name: cls(latency_ms.get(name, 0.0), error_rate.get(name, 0.0), seed=i).start()
+        for i, (name, cls) in enumerate(stubs.items())
+    }
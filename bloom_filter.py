@@ -0,0 +1,59 @@
+import hashlib
+import math
+from typing import Iterable, Optional
+
+
+def bloom_size(capacity: int, fp_rate: float):
+    """Bits and hash count for ``capacity`` items at the target false-positive rate."""
+    capacity = max(1, capacity)
+    num_bits = max(64, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+    num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+    return num_bits, num_hashes
+
+
+def item_digest(item: str) -> bytes:
+    return hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+
+
+class BloomFilter:
+    """Bloom filter over strings; ``in`` is False only for items never added.
+
+    Bit positions come from one 128-bit BLAKE2b digest split into two 64-bit
+    halves (double hashing). The bits can live in any writable or read-only
+    buffer, so a filter can also be read straight from a memory-mapped file.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int, bits=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def for_items(cls, items: Iterable[str], fp_rate: float = 0.01, headroom: float = 2.0,
+                  min_capacity: int = 1024) -> 'BloomFilter':
+        """Build a filter holding ``items``, sized for ``headroom`` times as many at ``fp_rate``."""
+        items = list(items)
+        bloom = cls(*bloom_size(max(min_capacity, int(len(items) * headroom)), fp_rate))
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str, digest: Optional[bytes] = None):
+        for position in self._positions(digest or item_digest(item)):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, item: str, digest: Optional[bytes] = None) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(digest or item_digest(item)))
+
+    __contains__ = might_contain
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
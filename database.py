@@ -2,14 +2,21 @@ from datetime import datetime
 import os
 import json
 import requests
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import urllib.parse
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from metrics import span
+from rate_limiter import RateLimitExceeded, RateLimitedAdapter
+from replay_transport import install_transport
+from shared_user_index import SharedUserIndex
+from user_index_cache import UserIndexCache, index_counters
 
 class Database:
     def __init__(self, max_retries=3, retry_delay=1):
         print("\n=== Database Initialization ===")
-        self.blob_api_url = "https://blob.vercel-storage.com"
+        self.blob_api_url = os.getenv('BLOB_API_URL', "https://blob.vercel-storage.com")
         self.blob_token = os.getenv('BLOB_READ_WRITE_TOKEN')
         self.users_prefix = "users/"
         self.user_paths = {}  # Store the full paths of user files
@@ -17,9 +24,24 @@ class Database:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.initialized = False
+        self.fetch_concurrency = max(1, int(os.getenv('USER_FETCH_CONCURRENCY', '16')))
+        self.last_fetch_failures = {}  # email -> reason, from the latest get_all_users
+        
+        # Built on first use in each process; see _blob_session
+        self._sessions = {}
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+        
+        # In-process copy of users/_index.json, revalidated with If-None-Match after the TTL
+        self.index_cache = UserIndexCache(
+            ttl_seconds=float(os.getenv('USER_INDEX_TTL', '30')),
+            fp_rate=float(os.getenv('USER_BLOOM_FP_RATE', '0.01')),
+            negative_ttl_seconds=float(os.getenv('USER_BLOOM_NEGATIVE_TTL', '2'))
+        )
         
         if not self._validate_token():
             return
+        self._use_shared_index()
             
         try:
             self._initialize_with_retries()
@@ -65,6 +87,20 @@ class Database:
             print("Please check your Vercel project settings and ensure you're using the correct token")
             return False
 
+    def _use_shared_index(self):
+        """Share one users index between all workers on the host when /dev/shm is available."""
+        shared_dir = os.getenv('USER_INDEX_SHARED_DIR', '/dev/shm')
+        if os.getenv('USER_INDEX_SHARED', 'true').lower() in ('0', 'false', 'no'):
+            return
+        if not (os.path.isdir(shared_dir) and os.access(shared_dir, os.W_OK)):
+            return
+        path = os.path.join(shared_dir, f"linkedin_ai_news-users-{self.store_id}.idx")
+        self.index_cache = SharedUserIndex(
+            path, ttl_seconds=self.index_cache.ttl_seconds, fp_rate=self.index_cache.fp_rate,
+            negative_ttl_seconds=self.index_cache.negative_ttl_seconds
+        )
+        print(f"Using shared users index: {path}")
+
     def _initialize_with_retries(self):
         """Initialize database with retries for serverless environment"""
         last_error = None
@@ -86,7 +122,44 @@ class Database:
             raise last_error
         return False
 
-    def _make_request(self, method, url, **kwargs):
+    def _blob_session(self, limiter_name: str) -> requests.Session:
+        """This process's session drawing from the ``limiter_name`` rate limit bucket.
+
+        gunicorn preloads the app and forks workers, so a session built before
+        the fork would hand every worker the same keep-alive sockets. Each
+        process builds its own on first use instead. The pool is sized so
+        every concurrent user fetch keeps its connection alive.
+        """
+        if self._session_pid != os.getpid():
+            with self._session_lock:
+                if self._session_pid != os.getpid():
+                    self._sessions = {}
+                    self._session_pid = os.getpid()
+        session = self._sessions.get(limiter_name)
+        if session is None:
+            with self._session_lock:
+                session = self._sessions.get(limiter_name)
+                if session is None:
+                    session = requests.Session()
+                    adapter = RateLimitedAdapter(limiter_name, pool_connections=4,
+                                                 pool_maxsize=self.fetch_concurrency)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    install_transport(session)
+                    self._sessions[limiter_name] = session
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """Session for blob API calls, under the host-wide ``blob`` rate limit."""
+        return self._blob_session('blob')
+
+    @property
+    def read_session(self) -> requests.Session:
+        """Session for downloading user records, under its own ``blob_read`` rate limit."""
+        return self._blob_session('blob_read')
+
+    def _make_request(self, method, url, session: requests.Session = None, **kwargs):
         """Make HTTP request with retries"""
         # Only check initialization for non-GET requests that are not part of initialization
         if not self.initialized and method != 'GET' and not (url.endswith('_index.json') or '_index.json' in url):
@@ -94,13 +167,17 @@ class Database:
             
         for attempt in range(self.max_retries):
             try:
-                response = requests.request(
-                    method,
-                    url,
-                    timeout=10,  # Increased timeout
-                    **kwargs
-                )
+                with span('blob_request', method=method):
+                    response = (session or self.session).request(
+                        method,
+                        url,
+                        timeout=10,  # Increased timeout
+                        **kwargs
+                    )
                 return response
+            except RateLimitExceeded:
+                # Waiting out the blob budget again would only hold the web request longer
+                raise
             except requests.exceptions.RequestException as e:
                 print(f"Request attempt {attempt + 1} failed: {e}")
                 if attempt < self.max_retries - 1:
@@ -146,7 +223,7 @@ class Database:
                     'PUT',
                     index_url,
                     headers=headers,
-                    json={"emails": [], "paths": {}}
+                    json={"emails": [], "paths": {}, "stats": {"total": 0, "daily": {}}}
                 )
                 print(f"Index creation response: {response.status_code}")
                 if response.status_code == 200:
@@ -169,15 +246,23 @@ class Database:
             print(f"Error ensuring users index exists: {e}")
             return False
 
+    def _fetch_users_index(self, extra_headers: Dict) -> requests.Response:
+        """GET the users index, with conditional headers from the index cache."""
+        headers = self._get_headers()
+        headers.update(extra_headers)
+        return self._make_request('GET', f"{self.blob_api_url}/{self.users_prefix}_index.json", headers=headers)
+
+    def _get_users_index(self, force: bool = False) -> Optional[Dict]:
+        """Return the users index from the in-process cache, revalidating it once the TTL expires."""
+        return self.index_cache.get(self._fetch_users_index, force=force)
+
     def _load_user_paths(self):
         """Load existing user paths from the index"""
         try:
             print("\nLoading user paths...")
-            index_url = f"{self.blob_api_url}/{self.users_prefix}_index.json"
-            response = self._make_request('GET', index_url, headers=self._get_headers())
+            index_data = self._get_users_index()
             
-            if response.status_code == 200:
-                index_data = response.json()
+            if index_data is not None:
                 if isinstance(index_data, dict) and 'paths' in index_data:
                     self.user_paths = index_data['paths']
                     print(f"Loaded {len(self.user_paths)} user paths")
@@ -201,14 +286,26 @@ class Database:
             index_url = f"{self.blob_api_url}/{self.users_prefix}_index.json"
             print(f"Index URL: {index_url}")
             
-            # Update paths dictionary
+            # Keep users other instances added since this one loaded the index
+            cached_index = self._get_users_index() or {}
+            for known_email, known_path in (cached_index.get('paths') or {}).items():
+                self.user_paths.setdefault(known_email, known_path)
+            counters = index_counters(cached_index)
+            
+            # Update paths dictionary, counting a registration only for a new email
             if file_path:
+                if email not in self.user_paths:
+                    today = datetime.now().date().isoformat()
+                    counters['daily'][today] = counters['daily'].get(today, 0) + 1
                 self.user_paths[email] = file_path
+            # The total follows the merged paths, so it cannot drift from the index
+            counters['total'] = len(self.user_paths)
             
-            # Create index data with both emails list and paths dictionary
+            # Create index data with the emails list, paths dictionary and counters
             index_data = {
                 'emails': list(self.user_paths.keys()),
-                'paths': self.user_paths
+                'paths': self.user_paths,
+                'stats': counters
             }
             
             # Update index with retries
@@ -226,12 +323,33 @@ class Database:
             
             success = response.status_code == 200
             print(f"Index update success: {success}")
+            if success:
+                self.index_cache.update(index_data)
+                self._write_user_counters(counters)
             return success
             
         except Exception as e:
             print(f"Error updating users index: {e}")
             return False
 
+    def _write_user_counters(self, counters: Dict):
+        """Mirror the index counters to users/_stats.json, so counts are read without the index.
+
+        The index stays the source of truth; a failed write is only logged and
+        the next index update rewrites the counters.
+        """
+        try:
+            response = self._make_request(
+                'PUT',
+                f"{self.blob_api_url}/{self.users_prefix}_stats.json",
+                headers=self._get_headers(),
+                json=counters
+            )
+            if response.status_code != 200:
+                print(f"Failed to save user counters: {response.status_code}")
+        except Exception as e:
+            print(f"Error saving user counters: {e}")
+
     def add_user(self, name: str, email: str) -> bool:
         """Add a new user to Vercel Blob Storage."""
         if not self.initialized:
@@ -299,34 +417,19 @@ class Database:
         try:
             print(f"\nChecking if user exists: {email}")
             
-            # Check if we have the user's file path
-            if email in self.user_paths:
-                file_url = self.user_paths[email]
-                print(f"Found stored path: {file_url}")
-                
-                # Try to access the file with retries
-                response = self._make_request('GET', file_url)
-                print(f"User check response: {response.status_code}")
-                
-                if response.status_code == 200:
-                    print("User found using stored path")
-                    return True
-            
-            # If no stored path or file not found, check the index
-            index_url = f"{self.blob_api_url}/{self.users_prefix}_index.json"
-            response = self._make_request('GET', index_url, headers=self._get_headers())
+            # Definite negatives from a just-revalidated Bloom filter need no index lookup
+            if not self.index_cache.might_contain(email, self._fetch_users_index):
+                print("User not found (Bloom filter)")
+                return False
             
-            if response.status_code == 200:
-                try:
-                    index_data = response.json()
-                    emails = index_data.get('emails', [])
-                    exists = email in emails
-                    print(f"User found in index: {exists}")
-                    return exists
-                except Exception as e:
-                    print(f"Error parsing index data: {e}")
+            # Answered from the cached index; a miss revalidates in case another instance added the user
+            exists = self.index_cache.lookup(email, self._fetch_users_index)
+            if exists is None:
+                print("Users index unavailable")
+                return False
             
-            return False
+            print(f"User found in index: {exists}")
+            return exists
             
         except Exception as e:
             print(f"Error checking user existence: {e}")
@@ -354,47 +457,102 @@ class Database:
             print(f"Error getting user: {e}")
             return None
 
+    def _fetch_user(self, email: str, path: Optional[str] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """Fetch one user's record from its indexed ``path``, returning it or the reason it failed."""
+        try:
+            response = self._make_request(
+                'GET',
+                path or f"{self.blob_api_url}/{self.users_prefix}{email}.json",
+                session=self.read_session,
+                headers=self._get_headers()
+            )
+            if response.status_code != 200:
+                return None, f"HTTP {response.status_code}"
+            return response.json(), None
+        except Exception as e:
+            return None, str(e)
+
+    def fetch_users(self, emails: List[str], paths: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], Dict[str, str]]:
+        """Fetch user records concurrently, newest first, with a failure reason per email.
+
+        Records are read from the blob URLs in ``paths`` (as stored in the
+        users index), falling back to ``users/<email>.json``. At most
+        ``fetch_concurrency`` requests are in flight, drawing from the
+        ``blob_read`` rate limit (RATE_LIMIT_BLOB_READ_RATE / _BURST), so
+        latency grows with ``len(emails) / fetch_concurrency``.
+        """
+        users = []
+        failures = {}
+        if not emails:
+            return users, failures
+        paths = paths or {}
+        with ThreadPoolExecutor(max_workers=min(self.fetch_concurrency, len(emails))) as executor:
+            results = executor.map(lambda email: self._fetch_user(email, paths.get(email)), emails)
+            for email, (user_data, error) in zip(emails, results):
+                if user_data:
+                    users.append(user_data)
+                else:
+                    failures[email] = error or 'empty record'
+        users.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        return users, failures
+
     def get_all_users(self) -> List[Dict]:
         """Get all users from Vercel Blob Storage."""
         if not self.initialized:
             raise ValueError("Database not initialized. BLOB_READ_WRITE_TOKEN is required.")
             
         try:
-            # Get users index with retries
-            response = self._make_request(
-                'GET',
-                f"{self.blob_api_url}/{self.users_prefix}_index.json",
-                headers=self._get_headers()
-            )
+            # Get users index, revalidated through the index cache
+            index_data = self._get_users_index()
             
-            if response.status_code == 200:
-                index_data = response.json()
+            if index_data is not None:
                 emails = index_data.get('emails', [])
                 
-                # Get all user data
-                users = []
-                for email in emails:
-                    user_data = self.get_user_by_email(email)
-                    if user_data:
-                        users.append(user_data)
+                # Get all user data from the indexed paths, several users at a time
+                users, failures = self.fetch_users(emails, index_data.get('paths'))
+                self.last_fetch_failures = failures
+                for email, reason in failures.items():
+                    print(f"Failed to get user {email}: {reason}")
                 
-                return sorted(users, key=lambda x: x['created_at'], reverse=True)
+                return users
             
-            print(f"Failed to get users index. Status: {response.status_code}")
+            print("Failed to get users index")
             return []
             
         except Exception as e:
             print(f"Error getting all users: {e}")
             return []
 
-    def get_user_count(self) -> int:
-        """Get the total number of users."""
+    def get_user_counters(self) -> Optional[Dict]:
+        """Get the user total and registrations per day from users/_stats.json.
+
+        This is one GET of a blob whose size does not depend on the number of
+        users. Stores written before the counters blob existed fall back to the
+        counters in the users index. Returns None if neither is available.
+        """
         if not self.initialized:
             raise ValueError("Database not initialized. BLOB_READ_WRITE_TOKEN is required.")
             
         try:
-            users = self.get_all_users()
-            return len(users)
+            response = self._make_request(
+                'GET',
+                f"{self.blob_api_url}/{self.users_prefix}_stats.json",
+                headers=self._get_headers()
+            )
+            if response.status_code == 200:
+                return index_counters({'stats': response.json()})
+            print(f"User counters unavailable ({response.status_code}), reading the users index")
+            return self.index_cache.counters(self._fetch_users_index)
         except Exception as e:
-            print(f"Error getting user count: {e}")
-            return 0 
\ No newline at end of file
+            print(f"Error getting user counters: {e}")
+            return None
+
+    def get_user_count(self) -> int:
+        """Get the total number of users."""
+        counters = self.get_user_counters()
+        return counters['total'] if counters is not None else 0
+
+    def get_registration_counts(self) -> Dict[str, int]:
+        """Get the number of registrations per day (YYYY-MM-DD)."""
+        counters = self.get_user_counters()
+        return counters['daily'] if counters is not None else {}
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import requests
+from typing import Dict, Iterator, List, Optional
+from urllib3.util.retry import Retry
+from metrics import span
+from rate_limiter import RateLimitedAdapter
+from replay_transport import install_transport
+
+DEEPSEEK_API_URL = os.getenv('DEEPSEEK_API_URL', 'https://api.deepseek.com/v1')
+
+
+class DeepSeekClient:
+    """Pooled keep-alive HTTP client for the DeepSeek chat completions API.
+
+    All requests share one ``requests.Session`` so TLS connections are reused
+    between calls. Failed requests (429 and 5xx) are retried with exponential
+    backoff, honoring any ``Retry-After`` header the API sends.
+    """
+
+    def __init__(self, api_key: str, base_url: str = None, pool_size: int = None,
+                 connect_timeout: float = None, read_timeout: float = None,
+                 max_retries: int = None, backoff_factor: float = None):
+        self.api_key = api_key
+        self.base_url = (base_url or DEEPSEEK_API_URL).rstrip('/')
+        self.pool_size = pool_size or int(os.getenv('DEEPSEEK_POOL_SIZE', '10'))
+        self.timeout = (
+            connect_timeout or float(os.getenv('DEEPSEEK_CONNECT_TIMEOUT', '5')),
+            read_timeout or float(os.getenv('DEEPSEEK_READ_TIMEOUT', '60'))
+        )
+
+        retry_strategy = Retry(
+            total=max_retries if max_retries is not None else int(os.getenv('DEEPSEEK_MAX_RETRIES', '3')),
+            backoff_factor=backoff_factor if backoff_factor is not None else 1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(['GET', 'POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.adapter = RateLimitedAdapter(
+            'deepseek',
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=retry_strategy,
+            pool_block=True,
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        install_transport(self.session)
+        self.session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        })
+
+    def chat_completion(self, messages: List[Dict], model: str = 'deepseek-chat', **params) -> requests.Response:
+        """POST a chat completion request and return the raw response."""
+        data = {'messages': messages, 'model': model}
+        data.update(params)
+        with span('deepseek_request', model=model):
+            return self.session.post(
+                f"{self.base_url}/chat/completions",
+                json=data,
+                timeout=self.timeout,
+                stream=bool(params.get('stream'))
+            )
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Return how many connections were opened versus requests sent.
+
+        ``reused`` counts requests that went out over an already-open
+        connection and therefore skipped the TCP/TLS handshake.
+        """
+        connections = 0
+        sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            sent += pool.num_requests
+        return {
+            'requests': sent,
+            'connections_opened': connections,
+            'reused': max(0, sent - connections),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+def iter_stream_content(response: requests.Response) -> Iterator[str]:
+    """Yield content deltas from a streamed (server-sent events) chat completion.
+
+    Raises ValueError if an event cannot be parsed, so callers can fall back.
+    """
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        payload = line[len('data:'):].strip()
+        if payload == '[DONE]':
+            return
+        event = json.loads(payload)
+        choices = event.get('choices') or []
+        if not choices:
+            continue
+        delta = choices[0].get('delta') or {}
+        if delta.get('content'):
+            yield delta['content']
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_deepseek_client(api_key: str) -> Optional[DeepSeekClient]:
+    """Return the process-wide shared client for ``api_key``.
+
+    Clients are keyed by PID too, so a worker forked from a preloaded app
+    never reuses its parent's pooled connections.
+    """
+    if not api_key:
+        return None
+    key = (os.getpid(), api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = DeepSeekClient(api_key)
+            _clients[key] = client
+        return client
@@ -0,0 +1,202 @@
+import json
+from datetime import datetime
+from string import Formatter
+from typing import Dict, Iterable, List, Optional
+
+# LinkedIn rejects share commentary longer than this
+LINKEDIN_COMMENTARY_LIMIT = 3000
+
+DEFAULT_SECTIONS = {
+    'header': (
+        "🤖 AI Innovation Digest - {date}\n\n"
+        "Today's curated insights on the latest AI developments, analyzed by our AI for busy professionals.\n\n"
+    ),
+    'article': "📰 {index}. {title}\n\n",
+    'analysis': (
+        "🔍 Key Takeaway: {takeaway}\n"
+        "💡 Impact: {impact}\n"
+        "💼 Why It Matters: {why_matters}\n"
+    ),
+    'article_end': "🔗 Read more: {url}\n\n",
+    'footer': (
+        "-------------------\n"
+        "🚀 Want AI-powered insights for your LinkedIn presence?\n"
+        "Check out our AI News Poster service: {promo_url}\n"
+        "Stay ahead of the curve with automated, intelligent content curation.\n\n"
+    ),
+    'hashtags': "{hashtags}",
+}
+
+DEFAULT_VARIABLES = {
+    'promo_url': 'https://linkedin-ai-news.vercel.app',
+    'hashtags': '#ArtificialIntelligence #AIInnovation #TechNews #FutureOfWork #LinkedInAutomation',
+}
+
+# Fields filled in per article; everything else is a digest or account variable
+ARTICLE_FIELDS = frozenset(['index', 'title', 'url', 'takeaway', 'impact', 'why_matters', 'source'])
+
+
+class CompiledSection:
+    """A template section checked once for its fields and rendered with ``format_map``."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.fields = set()
+        for _, field, spec, conversion in Formatter().parse(source):
+            if field is not None and (spec or conversion or not field.isidentifier()):
+                raise ValueError(f"Unsupported template field: {{{field}}}")
+            if field:
+                self.fields.add(field)
+        self.static_text = source.format_map({}) if not self.fields else None
+
+    def render(self, context: Dict) -> str:
+        if self.static_text is not None:
+            return self.static_text
+        # Fields were checked to be bare names, so no format spec or conversion can apply
+        return self.source.format_map(context)
+
+
+def _clean(text: str) -> str:
+    return ' '.join((text or '').split())
+
+
+def article_context(index: int, article: Dict) -> Dict:
+    """Normalize an article into the fields templates can use."""
+    context = {
+        'index': index,
+        # Drop the " - Source" suffix NewsAPI appends to titles
+        'title': _clean(article['title'].split(' - ')[0]),
+        'url': article['url'].strip(),
+        'source': (article.get('source') or {}).get('name', ''),
+    }
+    analysis = article.get('analysis')
+    if analysis:
+        context.update({
+            'takeaway': _clean(analysis['takeaway']),
+            'impact': _clean(analysis['impact']),
+            'why_matters': _clean(analysis['why_matters']),
+        })
+    return context
+
+
+class PreparedDigest:
+    """Articles and digest-wide variables resolved once, ready for many renders.
+
+    Sections that only use article and digest fields are rendered here, so
+    per-account rendering only touches sections that reference account
+    variables.
+    """
+
+    def __init__(self, template: 'DigestTemplate', articles: List[Dict], variables: Dict):
+        self.template = template
+        self.variables = variables
+        self.article_contexts = [article_context(i, article) for i, article in enumerate(articles, 1)]
+        self._cache = {}
+        self.article_blocks = None
+        if not (template.block_fields - ARTICLE_FIELDS) - variables.keys():
+            self.article_blocks = [self._article_block(context, variables) for context in self.article_contexts]
+
+    def _article_block(self, article: Dict, variables: Dict) -> str:
+        context = dict(variables)
+        context.update(article)
+        template = self.template
+        pieces = [template.sections['article'].render(context)]
+        if 'takeaway' in article:
+            pieces.append(template.sections['analysis'].render(context))
+        pieces.append(template.sections['article_end'].render(context))
+        return ''.join(pieces)
+
+    def section(self, name: str, account: Dict) -> str:
+        compiled = self.template.sections[name]
+        if compiled.fields <= self.variables.keys() and not compiled.fields & account.keys():
+            cached = self._cache.get(name)
+            if cached is None:
+                cached = compiled.render(self.variables)
+                self._cache[name] = cached
+            return cached
+        context = dict(self.variables)
+        context.update(account)
+        return compiled.render(context)
+
+    def blocks(self, account: Dict) -> List[str]:
+        if self.article_blocks is not None and not self.template.block_fields & account.keys():
+            return self.article_blocks
+        variables = dict(self.variables)
+        variables.update(account)
+        return [self._article_block(context, variables) for context in self.article_contexts]
+
+
+class DigestTemplate:
+    """Compiled digest template: header, per-article block, footer and hashtags.
+
+    Sections use ``str.format`` style ``{field}`` placeholders without format
+    specs. Article blocks are built from the ``article``, ``analysis`` (only
+    for analyzed articles) and ``article_end`` sections. Output is kept within
+    ``max_length`` by dropping trailing articles from the already-rendered
+    blocks, so nothing is rendered twice.
+    """
+
+    SECTION_NAMES = ('header', 'article', 'analysis', 'article_end', 'footer', 'hashtags')
+
+    def __init__(self, sections: Dict[str, str] = None, variables: Dict = None,
+                 max_length: int = LINKEDIN_COMMENTARY_LIMIT):
+        merged = dict(DEFAULT_SECTIONS)
+        merged.update(sections or {})
+        self.sections = {name: CompiledSection(merged[name]) for name in self.SECTION_NAMES}
+        self.variables = dict(DEFAULT_VARIABLES)
+        self.variables.update(variables or {})
+        self.max_length = max_length
+        self.block_fields = set().union(
+            *(self.sections[name].fields for name in ('article', 'analysis', 'article_end'))
+        )
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'DigestTemplate':
+        """Load a template from a JSON file with ``sections`` and optional ``variables``."""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('sections'), data.get('variables'), **kwargs)
+
+    def prepare(self, articles: List[Dict], date: Optional[datetime] = None,
+                variables: Dict = None) -> PreparedDigest:
+        digest_variables = dict(self.variables)
+        digest_variables['date'] = (date or datetime.now()).strftime("%B %d, %Y")
+        digest_variables.update(variables or {})
+        return PreparedDigest(self, articles, digest_variables)
+
+    def render_prepared(self, prepared: PreparedDigest, account: Dict = None) -> str:
+        account = account or {}
+        header = prepared.section('header', account)
+        tail = prepared.section('footer', account) + prepared.section('hashtags', account)
+        blocks = prepared.blocks(account)
+
+        budget = self.max_length - len(header) - len(tail)
+        kept = []
+        used = 0
+        for block in blocks:
+            if used + len(block) > budget:
+                break
+            kept.append(block)
+            used += len(block)
+        if not kept and blocks and budget > 0:
+            # Not even one article fits; shorten the first one rather than posting none
+            kept.append(blocks[0][:max(0, budget - 2)].rstrip() + "\n\n")
+        text = ''.join([header, *kept, tail])
+        return text if len(text) <= self.max_length else text[:self.max_length]
+
+    def render(self, articles: List[Dict], account: Dict = None, date: Optional[datetime] = None) -> str:
+        """Render one digest for ``articles``, optionally personalized for an account.
+
+        Preparing the digest costs more than the shared work it saves here;
+        rendering for many accounts should go through ``render_many``.
+        """
+        return self.render_prepared(self.prepare(articles, date=date), account)
+
+    def render_many(self, articles: List[Dict], accounts: Iterable[Dict],
+                    date: Optional[datetime] = None) -> List[str]:
+        """Render one personalized digest per account, sharing all account-independent work."""
+        prepared = self.prepare(articles, date=date)
+        return [self.render_prepared(prepared, account) for account in accounts]
+
+
+DEFAULT_TEMPLATE = DigestTemplate()
@@ -0,0 +1,152 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have how in is it its of on or that the
+this to was were what when which who why will with new says after over into
+""".split())
+
+FINGERPRINT_BITS = 64
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def _to_signed(value: int) -> int:
+    """Map an unsigned 64-bit fingerprint onto SQLite's signed INTEGER range."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class DuplicateIndex:
+    """Persistent SimHash index for spotting near-duplicate stories.
+
+    Each article is reduced to a 64-bit SimHash of its title and description.
+    The fingerprint is split into four 16-bit bands; two fingerprints within
+    ``max_distance`` (at most 3) bits of each other must share at least one
+    band exactly, so lookups only compare against candidates from the same
+    band buckets. Fingerprints older than ``retention_days`` are pruned.
+    """
+
+    def __init__(self, path: str, max_distance: int = 3, retention_days: int = 14):
+        if max_distance >= BANDS:
+            raise ValueError(f"max_distance must be below {BANDS} for banded lookup")
+        self.path = path
+        self.max_distance = max_distance
+        self.retention_seconds = retention_days * 24 * 3600
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    fingerprint INTEGER NOT NULL,
+                    band0 INTEGER NOT NULL,
+                    band1 INTEGER NOT NULL,
+                    band2 INTEGER NOT NULL,
+                    band3 INTEGER NOT NULL,
+                    url TEXT,
+                    title TEXT,
+                    seen_at REAL NOT NULL
+                )
+            """)
+            for band in range(BANDS):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_fingerprints_band{band} ON fingerprints (band{band})")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fingerprints_seen_at ON fingerprints (seen_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def fingerprint(article: Dict) -> int:
+        """Compute the 64-bit SimHash of an article's title and description."""
+        title = (article.get('title') or '').split(' - ')[0]
+        text = f"{title} {article.get('description') or ''}".lower()
+        tokens = [t for t in TOKEN_PATTERN.findall(text) if t not in STOPWORDS]
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        if not features:
+            return 0
+
+        weights = [0] * FINGERPRINT_BITS
+        for feature in features:
+            h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+            for bit in range(FINGERPRINT_BITS):
+                weights[bit] += 1 if (h >> bit) & 1 else -1
+
+        value = 0
+        for bit, weight in enumerate(weights):
+            if weight > 0:
+                value |= 1 << bit
+        return value
+
+    @staticmethod
+    def bands(fingerprint: int) -> List[int]:
+        return [(fingerprint >> (band * BAND_BITS)) & BAND_MASK for band in range(BANDS)]
+
+    @staticmethod
+    def distance(a: int, b: int) -> int:
+        return bin(a ^ b).count('1')
+
+    def seen_before(self, fingerprint: int) -> bool:
+        """Return True if a near-duplicate was recorded within the retention window."""
+        cutoff = time.time() - self.retention_seconds
+        bands = self.bands(fingerprint)
+        where = " OR ".join(f"band{band} = ?" for band in range(BANDS))
+        rows = self._connect().execute(
+            f"SELECT fingerprint FROM fingerprints WHERE ({where}) AND seen_at >= ?",
+            (*bands, cutoff)
+        )
+        return any(self.distance(fingerprint, _to_unsigned(row[0])) <= self.max_distance for row in rows)
+
+    def filter_new(self, articles: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield articles that are neither near-duplicates of each other nor of earlier posts."""
+        buckets = [{} for _ in range(BANDS)]
+        for article in articles:
+            fingerprint = self.fingerprint(article)
+            bands = self.bands(fingerprint)
+
+            duplicate = any(
+                self.distance(fingerprint, other) <= self.max_distance
+                for band, key in enumerate(bands)
+                for other in buckets[band].get(key, ())
+            )
+            if duplicate or self.seen_before(fingerprint):
+                print(f"Skipping near-duplicate story: {article.get('title')}")
+                continue
+
+            for band, key in enumerate(bands):
+                buckets[band].setdefault(key, []).append(fingerprint)
+            yield article
+
+    def record(self, articles: Iterable[Dict]):
+        """Remember posted articles and prune fingerprints past the retention window."""
+        now = time.time()
+        rows = []
+        for article in articles:
+            fingerprint = self.fingerprint(article)
+            rows.append((_to_signed(fingerprint), *self.bands(fingerprint),
+                         article.get('url'), article.get('title'), now))
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO fingerprints (fingerprint, band0, band1, band2, band3, url, title, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("DELETE FROM fingerprints WHERE seen_at < ?", (now - self.retention_seconds,))
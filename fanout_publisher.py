@@ -0,0 +1,136 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Union
+
+import requests
+from urllib3.util.retry import Retry
+
+from linkedin_api import LINKEDIN_API_URL, build_ugc_post, extract_post_id, linkedin_headers, person_urn
+from rate_limiter import RateLimitedAdapter
+from replay_transport import install_transport
+
+
+class RateLimitRetry(Retry):
+    """Retry that only resends a 429 carrying Retry-After, since ugcPosts is not idempotent.
+
+    A 5xx may come back after the post was created, so it is never retried;
+    connection errors are, because the request never reached LinkedIn.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset([429])
+
+
+def load_targets(path: str) -> List[Dict]:
+    """Load publishing targets from a JSON file.
+
+    The file holds a list of objects with ``access_token`` and ``person_id``
+    (a bare ID or a full URN), plus any extra fields used for personalization.
+    """
+    with open(path, encoding='utf-8') as f:
+        targets = json.load(f)
+    return [target for target in targets if target.get('access_token') and target.get('person_id')]
+
+
+class FanoutPublisher:
+    """Publishes a digest to many LinkedIn accounts concurrently.
+
+    At most ``max_concurrency`` posts are in flight overall and at most
+    ``per_account_limit`` per access token. Each account's targets are split
+    into that many lanes that post one after another, so a slow or throttled
+    account only holds its own lanes and never blocks a pool thread waiting
+    for its turn. All requests share one pooled session.
+    """
+
+    def __init__(self, max_concurrency: int = 20, per_account_limit: int = 1,
+                 session: requests.Session = None, timeout: int = 10):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_account_limit = max(1, per_account_limit)
+        self.timeout = timeout
+
+        if session is None:
+            session = requests.Session()
+            adapter = RateLimitedAdapter(
+                'linkedin',
+                pool_connections=1,
+                pool_maxsize=self.max_concurrency,
+                max_retries=RateLimitRetry(total=3, connect=3, read=False, other=0, backoff_factor=1,
+                                           allowed_methods=frozenset(['POST']), respect_retry_after_header=True,
+                                           raise_on_status=False)
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            install_transport(session)
+        self.session = session
+
+    def _lanes(self, targets: List[Dict]) -> List[List[int]]:
+        """Split target indexes into lanes holding at most ``per_account_limit`` lanes per access token."""
+        lanes = []
+        account_lanes = {}
+        for i, target in enumerate(targets):
+            own = account_lanes.setdefault(target['access_token'], [])
+            if len(own) < self.per_account_limit:
+                own.append([])
+                lanes.append(own[-1])
+            min(own, key=len).append(i)
+        return lanes
+
+    def _publish_one(self, target: Dict, content: Union[str, Callable[[Dict], str]]) -> Dict:
+        author = person_urn(target['person_id'])
+        result = {
+            'person_id': target['person_id'],
+            'success': False,
+            'status_code': None,
+            'post_id': None,
+            'error': None,
+            'elapsed': 0.0
+        }
+        started = time.perf_counter()
+        try:
+            text = content(target) if callable(content) else content
+            response = self.session.post(
+                f'{LINKEDIN_API_URL}/ugcPosts',
+                json=build_ugc_post(author, text),
+                headers=linkedin_headers(target['access_token']),
+                timeout=self.timeout
+            )
+            result['status_code'] = response.status_code
+            if response.ok:
+                result['success'] = True
+                result['post_id'] = extract_post_id(response)
+            else:
+                result['error'] = response.text[:500]
+        except Exception as e:
+            result['error'] = str(e)
+        result['elapsed'] = time.perf_counter() - started
+        return result
+
+    def publish(self, targets: List[Dict], content: Union[str, Callable[[Dict], str]]) -> List[Dict]:
+        """Post ``content`` to every target and return one result per target, in order.
+
+        ``content`` is either the post text or a callable that renders a
+        personalized text for a target.
+        """
+        if not targets:
+            return []
+        results = [None] * len(targets)
+
+        def publish_lane(lane):
+            for i in lane:
+                results[i] = self._publish_one(targets[i], content)
+
+        lanes = self._lanes(targets)
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(lanes)),
+                                thread_name_prefix="fanout") as executor:
+            list(executor.map(publish_lane, lanes))
+        return results
+
+    @staticmethod
+    def summarize(results: List[Dict]) -> Dict:
+        succeeded = sum(1 for result in results if result['success'])
+        return {
+            'total': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'max_elapsed': max((result['elapsed'] for result in results), default=0.0)
+        }
@@ -42,4 +42,16 @@ max_requests_jitter = 50
 
 # Logging Configuration
 capture_output = True
-enable_stdio_inheritance = True 
\ No newline at end of file
+enable_stdio_inheritance = True 
+
+# Metrics
+def on_starting(server):
+    # Workers sum their metrics files at /metrics; start each server from zero
+    from metrics import clear_metrics_dir
+    clear_metrics_dir()
+
+
+def child_exit(server, worker):
+    # Fold a recycled worker's metrics into one file so dead workers' files don't pile up
+    from metrics import fold_metrics_file
+    fold_metrics_file(worker.pid)
@@ -0,0 +1,75 @@
+"""Job handlers run by the worker processes in ``worker.py``.
+
+Each handler takes the job payload and fails by raising or returning False,
+which makes the queue retry the job with backoff.
+"""
+import multiprocessing
+import os
+
+from ai_news_poster import AINewsPoster
+from fanout_publisher import load_targets
+from job_queue import JobQueue
+from metrics import REGISTRY
+from ready_pool import ReadyPool
+
+METRICS_FILE = os.getenv('METRICS_FILE', 'metrics/worker.prom')
+READY_POOL_PATH = os.getenv('READY_POOL_PATH', '.cache/ready_pool.db')
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', '.cache/job_queue.db')
+
+HANDLERS = {
+    'post_digest': 'job_handlers:post_digest',
+    'refresh_ready_pool': 'job_handlers:refresh_ready_pool',
+    'publish_to_account': 'job_handlers:publish_to_account',
+}
+
+_poster = None
+
+
+def get_poster() -> AINewsPoster:
+    """One poster per worker process, so its HTTP pools and caches are reused across jobs."""
+    global _poster
+    if _poster is None:
+        _poster = AINewsPoster()
+        _poster.fanout_queue = JobQueue(JOB_QUEUE_PATH)
+    return _poster
+
+
+def write_metrics():
+    """Write this process's metrics next to the scheduler's, one file per worker slot."""
+    base, ext = os.path.splitext(METRICS_FILE)
+    try:
+        REGISTRY.write_file(f"{base}.{multiprocessing.current_process().name}{ext}")
+    except Exception as e:
+        print(f"Error writing metrics file: {e}")
+
+
+def post_digest(payload):
+    try:
+        ready_pool = ReadyPool(READY_POOL_PATH) if payload.get('ready_pool') else None
+        # run_id pins retries to one run, so a job that failed after posting never posts again
+        return get_poster().run(resume=payload.get('resume'), ready_pool=ready_pool, run_id=payload.get('run_id'))
+    finally:
+        write_metrics()
+
+
+def refresh_ready_pool(payload):
+    try:
+        get_poster().refresh_ready_pool(ReadyPool(READY_POOL_PATH), analyze_top=payload.get('analyze_top', 3))
+        return True
+    finally:
+        write_metrics()
+
+
+def publish_to_account(payload):
+    """Publish a digest to one fan-out target, looked up by ``person_id`` so tokens stay out of the queue."""
+    try:
+        targets = [
+            target for target in load_targets(payload['targets_file'])
+            if target['person_id'] == payload['person_id']
+        ]
+        if not targets:
+            raise ValueError(f"No target {payload['person_id']} in {payload['targets_file']}")
+        results = get_poster().publish_to_accounts(payload['content'], targets)
+        return all(result['success'] for result in results)
+    finally:
+        write_metrics()
@@ -0,0 +1,354 @@
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Optional
+
+
+class QueuedJob:
+    def __init__(self, row: sqlite3.Row):
+        self.id = row['id']
+        self.kind = row['kind']
+        self.payload = json.loads(row['payload'])
+        self.attempts = row['attempts']
+        self.max_attempts = row['max_attempts']
+
+    def __repr__(self):
+        return f"QueuedJob({self.id}, {self.kind}, attempt {self.attempts})"
+
+
+class JobQueue:
+    """Durable SQLite job queue shared by the scheduler and worker processes.
+
+    Workers claim a job by taking a lease and keep it alive with
+    heartbeats; a job whose lease expires (its worker died) is handed to the
+    next claimant. Failed jobs are retried with exponential backoff and moved
+    to the ``dead_letters`` table after ``max_attempts``. Every attempt is
+    recorded in ``job_runs`` with its duration and outcome.
+    """
+
+    def __init__(self, path: str, backoff_seconds: float = 30, max_backoff_seconds: float = 3600):
+        self.path = path
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    dedupe_key TEXT UNIQUE,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    run_after REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dead_letters (
+                    job_id INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    error TEXT,
+                    failed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    attempt INTEGER NOT NULL,
+                    worker TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    finished_at REAL NOT NULL,
+                    duration REAL NOT NULL,
+                    outcome TEXT NOT NULL,
+                    error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_runs_job_id ON job_runs (job_id)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode, so claim() can open its own BEGIN IMMEDIATE transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, kind: str, payload: Dict = None, max_attempts: int = 5, delay: float = 0,
+                dedupe_key: Optional[str] = None) -> int:
+        """Add a job and return its ID. A job with the same ``dedupe_key`` is only queued once."""
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO jobs (kind, payload, dedupe_key, max_attempts, run_after, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, json.dumps(payload or {}), dedupe_key, max_attempts, now + delay, now)
+        )
+        if cursor.rowcount:
+            return cursor.lastrowid
+        return conn.execute("SELECT id FROM jobs WHERE dedupe_key = ?", (dedupe_key,)).fetchone()['id']
+
+    def claim(self, worker: str, lease_seconds: float = 60, kinds: Optional[List[str]] = None) -> Optional[QueuedJob]:
+        """Lease the next runnable job to ``worker``, or return None when there is none."""
+        now = time.time()
+        conn = self._connect()
+        kind_filter = ''
+        params = [now, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE ((status = 'queued' AND run_after <= ?) "
+                    "OR (status = 'running' AND lease_expires < ?))" + kind_filter +
+                    " ORDER BY run_after, id LIMIT 1",
+                    params
+                ).fetchone()
+                if row is None or row['status'] == 'queued' or row['attempts'] < row['max_attempts']:
+                    break
+                # Its worker died on the last allowed attempt
+                self._dead_letter(conn, QueuedJob(row), now, f"lease expired (held by {row['lease_owner']})")
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, lease_expires = ? "
+                "WHERE id = ?",
+                (worker, now + lease_seconds, row['id'])
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return QueuedJob(row)
+
+    def heartbeat(self, job_id: int, worker: str, lease_seconds: float = 60) -> bool:
+        """Extend the lease; False means the job was reclaimed by another worker."""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (time.time() + lease_seconds, job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def _record_run(self, conn, job: QueuedJob, worker: str, started_at: float, outcome: str, error: str = None):
+        finished_at = time.time()
+        conn.execute(
+            "INSERT INTO job_runs (job_id, kind, attempt, worker, started_at, finished_at, duration, outcome, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.id, job.kind, job.attempts, worker, started_at, finished_at, finished_at - started_at, outcome, error)
+        )
+
+    def complete(self, job: QueuedJob, worker: str, started_at: float) -> bool:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', lease_owner = NULL, lease_expires = NULL, finished_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time(), job.id, worker)
+            )
+            self._record_run(conn, job, worker, started_at, 'success' if cursor.rowcount else 'lease_lost')
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def _dead_letter(self, conn, job: QueuedJob, now: float, error: str):
+        conn.execute(
+            "UPDATE jobs SET status = 'dead', last_error = ?, finished_at = ?, lease_owner = NULL, lease_expires = NULL "
+            "WHERE id = ?",
+            (error, now, job.id)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO dead_letters (job_id, kind, payload, attempts, error, failed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job.id, job.kind, json.dumps(job.payload), job.attempts, error, now)
+        )
+
+    def fail(self, job: QueuedJob, worker: str, started_at: float, error: str) -> str:
+        """Schedule a retry with backoff, or dead-letter the job. Returns the new status."""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if job.attempts >= job.max_attempts:
+                status, run_after, finished_at = 'dead', now, now
+            else:
+                status, finished_at = 'queued', None
+                delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (job.attempts - 1))
+                run_after = now + delay * random.uniform(0.9, 1.1)
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, run_after = ?, last_error = ?, finished_at = ?, "
+                "lease_owner = NULL, lease_expires = NULL WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (status, run_after, error, finished_at, job.id, worker)
+            )
+            if not cursor.rowcount:
+                # Another worker reclaimed the job; its attempt decides what happens next
+                status = 'lease_lost'
+            elif status == 'dead':
+                self._dead_letter(conn, job, now, error)
+            self._record_run(conn, job, worker, started_at, 'error' if cursor.rowcount else 'lease_lost', error)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return status
+
+    def requeue_dead(self, job_id: int) -> bool:
+        """Move a dead-lettered job back onto the queue with a fresh attempt budget."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            deleted = conn.execute("DELETE FROM dead_letters WHERE job_id = ?", (job_id,)).rowcount
+            if deleted:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', attempts = 0, run_after = ?, finished_at = NULL WHERE id = ?",
+                    (time.time(), job_id)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return bool(deleted)
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        counts = {row['status']: row['n'] for row in conn.execute(
+            "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+        )}
+        timings = {row['kind']: {'runs': row['n'], 'avg_seconds': row['avg'], 'max_seconds': row['max']}
+                   for row in conn.execute(
+                       "SELECT kind, COUNT(*) AS n, AVG(duration) AS avg, MAX(duration) AS max "
+                       "FROM job_runs GROUP BY kind")}
+        return {'jobs': counts, 'timings': timings}
+
+    def purge(self, older_than_seconds: float = 7 * 24 * 3600) -> int:
+        """Delete finished jobs and their run records older than the cutoff."""
+        cutoff = time.time() - older_than_seconds
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM job_runs WHERE job_id IN (SELECT id FROM jobs WHERE status = 'done' AND finished_at < ?)",
+                (cutoff,)
+            )
+            deleted = conn.execute("DELETE FROM jobs WHERE status = 'done' AND finished_at < ?", (cutoff,)).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return deleted
+
+
+def resolve_handler(path: str) -> Callable:
+    """Import a handler given as ``module:function``."""
+    module_name, _, attribute = path.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _worker_main(queue_path: str, handlers: Dict[str, str], lease_seconds: float, poll_interval: float,
+                 backoff_seconds: float, stop=None):
+    """Worker process loop: claim a job, run its handler while heartbeating, record the outcome."""
+    queue = JobQueue(queue_path, backoff_seconds=backoff_seconds)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    resolved = {}
+    while stop is None or not stop.is_set():
+        job = queue.claim(worker, lease_seconds, kinds=list(handlers))
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        done = threading.Event()
+
+        def keep_alive():
+            while not done.wait(lease_seconds / 3):
+                if not queue.heartbeat(job.id, worker, lease_seconds):
+                    print(f"Lost lease on job {job.id}")
+                    return
+
+        heartbeat = threading.Thread(target=keep_alive, name=f"heartbeat-{job.id}", daemon=True)
+        heartbeat.start()
+        started_at = time.time()
+        try:
+            if job.kind not in resolved:
+                resolved[job.kind] = resolve_handler(handlers[job.kind])
+            result = resolved[job.kind](job.payload)
+            if result is False:
+                raise RuntimeError(f"{job.kind} handler reported failure")
+        except Exception as e:
+            done.set()
+            status = queue.fail(job, worker, started_at, f"{e}\n{traceback.format_exc(limit=5)}")
+            print(f"Job {job.id} ({job.kind}) failed on attempt {job.attempts}: {e} -> {status}")
+        else:
+            done.set()
+            queue.complete(job, worker, started_at)
+        heartbeat.join()
+
+
+class WorkerPool:
+    """Pool of worker processes that run queued jobs in parallel across cores.
+
+    ``handlers`` maps job kinds to ``module:function`` paths, resolved inside
+    each worker process; a handler receives the job payload and fails by
+    raising or returning False.
+    """
+
+    def __init__(self, queue_path: str, handlers: Dict[str, str], processes: int = None,
+                 lease_seconds: float = 60, poll_interval: float = 1.0, backoff_seconds: float = 30):
+        self.queue_path = queue_path
+        self.handlers = handlers
+        self.processes = processes or min(4, os.cpu_count() or 1)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.backoff_seconds = backoff_seconds
+        self._stop = multiprocessing.Event()
+        self._workers = []
+
+    def start(self):
+        for i in range(self.processes):
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(self.queue_path, self.handlers, self.lease_seconds, self.poll_interval,
+                      self.backoff_seconds, self._stop),
+                name=f"job-worker-{i}",
+                daemon=True
+            )
+            process.start()
+            self._workers.append(process)
+        return self
+
+    def stop(self, timeout: float = 30):
+        """Ask workers to exit after their current job; jobs still running are reclaimed by lease expiry."""
+        self._stop.set()
+        for process in self._workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._workers = []
@@ -0,0 +1,225 @@
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover - Python 3.8 only gets UTC schedules
+    ZoneInfo = None
+
+# What to do with occurrences missed while the scheduler wasn't running
+CATCH_UP_POLICIES = ('skip', 'latest', 'all')
+
+
+def get_timezone(name: str):
+    if not name or name.upper() == 'UTC':
+        return timezone.utc
+    if ZoneInfo is None:
+        raise ValueError(f"Time zone {name} needs Python 3.9+ (zoneinfo)")
+    return ZoneInfo(name)
+
+
+class DailySchedule:
+    """Runs once a day at a wall-clock time in a time zone, following DST changes."""
+
+    def __init__(self, at: str = '09:00', tz: str = 'UTC'):
+        hour, minute = (int(part) for part in at.split(':'))
+        self.at = at
+        self.hour = hour
+        self.minute = minute
+        self.tz = get_timezone(tz)
+
+    def _occurrence(self, day) -> datetime:
+        local = datetime(day.year, day.month, day.day, self.hour, self.minute, tzinfo=self.tz)
+        return local.astimezone(timezone.utc)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First occurrence strictly after ``moment`` (an aware datetime), in UTC."""
+        day = moment.astimezone(self.tz).date()
+        occurrence = self._occurrence(day)
+        while occurrence <= moment:
+            day += timedelta(days=1)
+            occurrence = self._occurrence(day)
+        return occurrence
+
+    def previous_at_or_before(self, moment: datetime) -> datetime:
+        """Last occurrence at or before ``moment``, in UTC."""
+        day = moment.astimezone(self.tz).date()
+        occurrence = self._occurrence(day)
+        while occurrence > moment:
+            day -= timedelta(days=1)
+            occurrence = self._occurrence(day)
+        return occurrence
+
+
+class Job:
+    def __init__(self, job_id: str, schedule: DailySchedule, func: Callable, catch_up: str,
+                 max_lateness: Optional[float]):
+        self.job_id = job_id
+        self.schedule = schedule
+        self.func = func
+        self.catch_up = catch_up
+        self.max_lateness = max_lateness
+        self.version = 0
+
+
+class Scheduler:
+    """Min-heap scheduler that sleeps exactly until the next due job.
+
+    Adding, rescheduling and removing a job are O(log n): replaced heap
+    entries are skipped lazily when they reach the top. Completed runs are
+    recorded in SQLite, and on ``add`` each job's missed occurrences are
+    handled by its catch-up policy: ``skip`` ignores them, ``latest`` runs
+    once for the most recent one and ``all`` runs once per occurrence.
+    Occurrences more than ``max_lateness`` seconds old are never caught up.
+    """
+
+    def __init__(self, state_path: str = None, max_workers: int = 4, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._heap = []  # (due timestamp, sequence, job_id, version, recurring)
+        self._jobs: Dict[str, Job] = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scheduler')
+        self._db = None
+        self._db_lock = threading.Lock()
+        if state_path:
+            os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+            self._db = sqlite3.connect(state_path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS job_runs (job_id TEXT PRIMARY KEY, last_due REAL NOT NULL)"
+                )
+
+    def _now(self) -> datetime:
+        return datetime.fromtimestamp(self.clock(), timezone.utc)
+
+    def _last_due(self, job_id: str) -> Optional[float]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute("SELECT last_due FROM job_runs WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def _record_run(self, job_id: str, due: float):
+        if self._db is None:
+            return
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT INTO job_runs (job_id, last_due) VALUES (?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET last_due = MAX(last_due, excluded.last_due)",
+                (job_id, due)
+            )
+
+    def _missed(self, job: Job, now: datetime) -> List[float]:
+        """Occurrences since the last recorded run that should run now."""
+        last_due = self._last_due(job.job_id)
+        if last_due is None or job.catch_up == 'skip':
+            return []
+        missed = []
+        occurrence = job.schedule.previous_at_or_before(now)
+        while occurrence.timestamp() > last_due:
+            if job.max_lateness is not None and (now - occurrence).total_seconds() > job.max_lateness:
+                break
+            missed.append(occurrence.timestamp())
+            if job.catch_up == 'latest':
+                break
+            occurrence = job.schedule.previous_at_or_before(occurrence - timedelta(seconds=1))
+        return list(reversed(missed))
+
+    def _push(self, job: Job, due: float, recurring: bool = True):
+        heapq.heappush(self._heap, (due, next(self._sequence), job.job_id, job.version, recurring))
+
+    def add(self, job_id: str, schedule: DailySchedule, func: Callable, catch_up: str = 'latest',
+            max_lateness: Optional[float] = None):
+        """Add or replace a job. ``func`` is called with the job ID and its due time (UTC)."""
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy: {catch_up}")
+        job = Job(job_id, schedule, func, catch_up, max_lateness)
+        now = self._now()
+        with self._condition:
+            # A fresh version invalidates heap entries left by an earlier job with this ID
+            job.version = next(self._sequence)
+            self._jobs[job_id] = job
+            # Catch-up entries run once; the regular entry re-queues the next occurrence
+            for due in self._missed(job, now):
+                self._push(job, due, recurring=False)
+            self._push(job, schedule.next_after(now).timestamp())
+            self._condition.notify()
+        return job
+
+    def remove(self, job_id: str):
+        with self._condition:
+            self._jobs.pop(job_id, None)
+
+    def __len__(self):
+        with self._condition:
+            return len(self._jobs)
+
+    def next_due(self) -> Optional[float]:
+        with self._condition:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _discard_stale(self):
+        while self._heap:
+            _, _, job_id, version, _ = self._heap[0]
+            job = self._jobs.get(job_id)
+            if job is not None and job.version == version:
+                return
+            heapq.heappop(self._heap)
+
+    def _run(self, job: Job, due: float):
+        try:
+            job.func(job.job_id, datetime.fromtimestamp(due, timezone.utc))
+        except Exception as e:
+            print(f"Error in scheduled job {job.job_id}: {e}")
+        finally:
+            self._record_run(job.job_id, due)
+
+    def run_pending(self) -> int:
+        """Dispatch every job that is due now; returns how many were started."""
+        started = 0
+        with self._condition:
+            now = self.clock()
+            while True:
+                self._discard_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                due, _, job_id, _, recurring = heapq.heappop(self._heap)
+                job = self._jobs[job_id]
+                if recurring:
+                    self._push(job, job.schedule.next_after(datetime.fromtimestamp(due, timezone.utc)).timestamp())
+                self._executor.submit(self._run, job, due)
+                started += 1
+        return started
+
+    def run_forever(self):
+        """Sleep until the next due job and dispatch it, until ``stop`` is called."""
+        with self._condition:
+            while not self._stopped:
+                self._discard_stale()
+                delay = self._heap[0][0] - self.clock() if self._heap else None
+                if delay is None or delay > 0:
+                    # Woken early when a job is added or the scheduler stops
+                    self._condition.wait(timeout=delay)
+                    continue
+                self._condition.release()
+                try:
+                    self.run_pending()
+                finally:
+                    self._condition.acquire()
+
+    def stop(self, wait: bool = True):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,47 @@
+import os
+from typing import Dict, Optional
+
+LINKEDIN_API_URL = os.getenv('LINKEDIN_API_URL', 'https://api.linkedin.com/v2')
+
+
+def person_urn(person_id: str) -> str:
+    """Return a LinkedIn person URN, accepting either a bare ID or a full URN."""
+    return person_id if person_id.startswith('urn:li:') else f"urn:li:person:{person_id}"
+
+
+def build_ugc_post(author_urn: str, content: str) -> Dict:
+    """Build the ugcPosts payload for a public text post."""
+    return {
+        "author": author_urn,
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {
+            "com.linkedin.ugc.ShareContent": {
+                "shareCommentary": {
+                    "text": content
+                },
+                "shareMediaCategory": "NONE"
+            }
+        },
+        "visibility": {
+            "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
+        }
+    }
+
+
+def linkedin_headers(access_token: str) -> Dict:
+    return {
+        'Authorization': f'Bearer {access_token}',
+        'Content-Type': 'application/json',
+        'X-Restli-Protocol-Version': '2.0.0'
+    }
+
+
+def extract_post_id(response) -> Optional[str]:
+    """Return the ID of a created post from a ugcPosts response."""
+    post_id = response.headers.get('x-restli-id')
+    if not post_id:
+        try:
+            post_id = response.json().get('id')
+        except ValueError:
+            pass
+    return post_id
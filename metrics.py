@@ -0,0 +1,375 @@
+import functools
+import glob
+import hmac
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts skip the lock between folding and scraping
+    fcntl = None
+
+# Latency buckets in seconds, from fast blob reads to slow LLM completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Each web worker writes its metrics here and /metrics serves their sum; cleared when gunicorn starts
+METRICS_DIR = os.getenv('METRICS_DIR') or os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'linkedin_ai_news-metrics'
+)
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1'))
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: Tuple, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series['buckets']):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', repr(bound))])} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide collection of counters and latency histograms."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help_text)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str = '') -> Counter:
+        return self._get(Counter, name, help_text or name)
+
+    def histogram(self, name: str, help_text: str = '') -> Histogram:
+        return self._get(Histogram, name, help_text or name)
+
+    def collector(self, func):
+        """Register ``func`` to return extra exposition lines each time the registry is rendered."""
+        with self._lock:
+            self._collectors.append(func)
+        return func
+
+    def render(self, collect: bool = True) -> str:
+        """Render every metric in the Prometheus text exposition format.
+
+        ``collect=False`` leaves out the collectors, for output that is summed
+        with other processes' and must not repeat host-wide gauges.
+        """
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+            collectors = list(self._collectors) if collect else []
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.extend(self.render_collectors(collectors))
+        return '\n'.join(lines) + '\n'
+
+    def render_collectors(self, collectors=None):
+        if collectors is None:
+            with self._lock:
+                collectors = list(self._collectors)
+        lines = []
+        for collect in collectors:
+            try:
+                lines.extend(collect())
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        return lines
+
+    def write_file(self, path: str, collect: bool = True):
+        """Atomically write the current metrics to ``path``."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render(collect=collect))
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def merge_expositions(texts: Iterable[str]) -> str:
+    """Sum counter and histogram samples with the same name and labels across several expositions."""
+    families = {}
+    family = None
+    for text in texts:
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            if line.startswith('#'):
+                parts = line.split(' ', 3)
+                if len(parts) >= 3 and parts[1] in ('HELP', 'TYPE'):
+                    family = families.setdefault(parts[2], {'meta': {}, 'samples': {}})
+                    family['meta'].setdefault(parts[1], line)
+                continue
+            series, _, value = line.rpartition(' ')
+            if family is None or not series:
+                continue
+            samples = family['samples']
+            samples[series] = samples.get(series, 0.0) + float(value)
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        lines.extend(family['meta'][kind] for kind in ('HELP', 'TYPE') if kind in family['meta'])
+        for series, value in family['samples'].items():
+            lines.append(f"{series} {int(value) if value.is_integer() else value}")
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def _metrics_dir_lock(directory: str, exclusive: bool):
+    """Hold the metrics directory's ``flock``; scrapes share it, folding an exited worker takes it alone."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.lock'), 'a') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def fold_metrics_file(pid: int, directory: str = None):
+    """Add an exited worker's metrics to ``exited.prom`` and remove its own file.
+
+    Run from gunicorn's ``child_exit``, so recycled workers leave one
+    accumulated file behind instead of one file each.
+    """
+    directory = directory or METRICS_DIR
+    path = os.path.join(directory, f"http-{pid}.prom")
+    exited_path = os.path.join(directory, 'exited.prom')
+    with _metrics_dir_lock(directory, exclusive=True):
+        try:
+            with open(path, encoding='utf-8') as f:
+                texts = [f.read()]
+        except OSError:
+            return
+        try:
+            with open(exited_path, encoding='utf-8') as f:
+                texts.append(f.read())
+        except OSError:
+            pass
+        tmp_path = f"{exited_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(merge_expositions(texts))
+        os.replace(tmp_path, exited_path)
+        os.remove(path)
+
+
+def clear_metrics_dir(directory: str = None):
+    """Remove metrics left by a previous server, so counters start from zero; run once at startup."""
+    for path in glob.glob(os.path.join(directory or METRICS_DIR, '*.prom')):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class ProcessMetricsExporter:
+    """Shares this process's metrics with the other web workers through ``directory``.
+
+    gunicorn runs several workers and each /metrics scrape lands on one of
+    them, so every worker writes its registry to ``http-<pid>.prom`` at most
+    every ``flush_interval`` seconds after a request, and ``render`` sums all
+    the files. Files of exited workers are kept, so their counts are not lost
+    when gunicorn recycles a worker; ``fold_metrics_file`` sums them into
+    one file as workers exit.
+    """
+
+    def __init__(self, directory: str = None, flush_interval: float = None, registry: MetricsRegistry = None):
+        self.directory = directory or METRICS_DIR
+        self.flush_interval = METRICS_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.registry = registry or REGISTRY
+        self._dirty = threading.Event()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _path(self) -> str:
+        return os.path.join(self.directory, f"http-{os.getpid()}.prom")
+
+    def flush(self):
+        try:
+            self.registry.write_file(self._path(), collect=False)
+        except Exception as e:
+            print(f"Error writing metrics file: {e}")
+
+    def _flush_loop(self):
+        while True:
+            self._dirty.wait()
+            self._dirty.clear()
+            self.flush()
+            time.sleep(self.flush_interval)
+
+    def mark_dirty(self):
+        """Schedule a flush; the flushing thread is started once per process, after any fork."""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._dirty = threading.Event()
+                    threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+                    self._pid = os.getpid()
+        self._dirty.set()
+
+    def render(self) -> str:
+        """Metrics summed over every worker's file, plus this process's collectors."""
+        self.flush()
+        texts = []
+        # Shared with other scrapes; an exited worker's file is never counted both alone and folded
+        with _metrics_dir_lock(self.directory, exclusive=False):
+            for path in sorted(glob.glob(os.path.join(self.directory, '*.prom'))):
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        texts.append(f.read())
+                except OSError:
+                    continue
+        if not texts:
+            return self.registry.render()
+        lines = self.registry.render_collectors()
+        return merge_expositions(texts) + ('\n'.join(lines) + '\n' if lines else '')
+
+
+@contextmanager
+def span(name: str, **labels):
+    """Time a block into ``<name>_seconds`` and count it in ``<name>_total`` by outcome."""
+    started = time.perf_counter()
+    outcome = 'success'
+    try:
+        yield
+    except BaseException:
+        outcome = 'error'
+        raise
+    finally:
+        REGISTRY.histogram(f"{name}_seconds", f"Latency of {name.replace('_', ' ')}").observe(
+            time.perf_counter() - started, **labels
+        )
+        REGISTRY.counter(f"{name}_total", f"Number of {name.replace('_', ' ')} calls").inc(
+            outcome=outcome, **labels
+        )
+
+
+def timed(name: str, **labels):
+    """Decorator form of ``span``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_flask(app, exporter: ProcessMetricsExporter = None):
+    """Record per-endpoint request latency and serve it, summed over all workers, at /metrics.
+
+    /metrics only answers requests carrying ``Authorization: Bearer <METRICS_TOKEN>``;
+    without METRICS_TOKEN set it is disabled.
+    """
+    from flask import Response, abort, g, request
+
+    exporter = exporter or ProcessMetricsExporter()
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        started = getattr(g, '_metrics_started', None)
+        if started is not None and request.endpoint != 'metrics':
+            labels = {
+                'endpoint': request.endpoint or 'unknown',
+                'method': request.method,
+                'status': str(response.status_code)
+            }
+            REGISTRY.histogram('http_request_seconds', 'Latency of HTTP requests').observe(
+                time.perf_counter() - started, **labels
+            )
+            REGISTRY.counter('http_requests_total', 'Number of HTTP requests').inc(**labels)
+            exporter.mark_dirty()
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        token = os.getenv('METRICS_TOKEN')
+        if not token:
+            abort(404)
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+            return Response('Unauthorized\n', status=401, headers={'WWW-Authenticate': 'Bearer'})
+        return Response(exporter.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+    return app
@@ -0,0 +1,399 @@
+import json
+import os
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts only get per-process locking
+    fcntl = None
+
+NEWS_API_URL = os.getenv('NEWS_API_URL', 'https://newsapi.org/v2')
+
+DEFAULT_NEWS_QUERY = '("artificial intelligence" OR "machine learning" OR "ChatGPT" OR "OpenAI" OR "Google Gemini") AND (technology OR innovation OR research)'
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+
+def make_article(title, url, description='', published_at='', source_name='') -> Dict:
+    """Build an article dict in the same shape NewsAPI returns."""
+    return {
+        'title': (title or '').strip(),
+        'description': (description or '').strip(),
+        'url': (url or '').strip(),
+        'publishedAt': (published_at or '').strip(),
+        'source': {'name': source_name}
+    }
+
+
+class NewsSource:
+    """Base class for article sources. Subclasses yield NewsAPI-shaped article dicts."""
+
+    name = 'source'
+
+    def fetch(self) -> Iterator[Dict]:
+        """Yield this source's articles; every subclass must implement it."""
+        raise NotImplementedError
+
+    def commit(self, articles: List[Dict], exhausted: bool = False) -> List[Dict]:
+        """Called once the fetched articles are accepted; returns the ones to keep.
+
+        ``exhausted`` tells the source whether the caller read the stream to
+        its end, rather than stopping once it had enough articles.
+        """
+        return articles
+
+
+class FetchWatermark:
+    """The newest ``publishedAt`` already fetched, plus the URLs seen at that instant.
+
+    ``gaps`` lists ``[from, to]`` ranges below the watermark that were never
+    fully fetched, newest first. The watermark is a small JSON file replaced
+    atomically and updated under an ``flock``, so concurrent workers never
+    move it backwards and can tell which part of their window another worker
+    already took.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._thread_lock = threading.Lock()
+
+    def read(self) -> Dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {'published_at': '', 'urls': [], 'gaps': []}
+        return {
+            'published_at': state.get('published_at', ''),
+            'urls': state.get('urls', []),
+            'gaps': [list(gap) for gap in state.get('gaps', [])]
+        }
+
+    @staticmethod
+    def is_newer(article: Dict, watermark: Dict) -> bool:
+        published_at = article.get('publishedAt') or ''
+        return published_at > watermark['published_at'] or (
+            published_at == watermark['published_at'] and article.get('url') not in watermark['urls']
+        )
+
+    @staticmethod
+    def merge(watermark: Dict, articles: Iterable[Dict]) -> Dict:
+        """Return ``watermark`` moved forward past ``articles``."""
+        published_at = watermark['published_at']
+        urls = set(watermark['urls'])
+        for article in articles:
+            article_published = article.get('publishedAt') or ''
+            if article_published > published_at:
+                published_at, urls = article_published, set()
+            if article_published == published_at:
+                urls.add(article.get('url'))
+        return {'published_at': published_at, 'urls': sorted(u for u in urls if u),
+                'gaps': watermark.get('gaps', [])}
+
+    def advance(self, articles: List[Dict], gaps: Optional[List[List[str]]] = None) -> Dict:
+        """Move the watermark past ``articles``, replace its ``gaps`` if given,
+        and return the watermark it replaced."""
+        with self._thread_lock, open(f"{self.path}.lock", 'a') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                current = self.read()
+                updated = self.merge(current, articles)
+                if gaps is not None:
+                    updated['gaps'] = gaps
+                if updated != current:
+                    tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(updated, f)
+                    os.replace(tmp_path, self.path)
+                return current
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class NewsAPISource(NewsSource):
+    """Articles from the NewsAPI /v2/everything endpoint.
+
+    With a ``watermark`` the source only asks for articles published since
+    the last committed fetch and pages back until it reaches them, then
+    pages through the watermark's gaps, all within ``max_pages`` requests.
+    ``commit`` advances the watermark to the newest article the caller
+    consumed. Whatever part of a window was not fetched or not consumed
+    (``max_pages`` ran out, NewsAPI refused a deeper page or the caller
+    stopped reading) is stored as a gap and asked for with ``to=`` on later
+    runs; only the newest ``max_gaps`` gaps are kept.
+    """
+
+    name = 'newsapi'
+
+    def __init__(self, api_key: str, session: requests.Session = None,
+                 query: str = DEFAULT_NEWS_QUERY, page_size: int = 10, timeout: int = 10,
+                 watermark: FetchWatermark = None, max_pages: int = 5, max_gaps: int = 5):
+        self.api_key = api_key
+        self.session = session or requests.Session()
+        self.query = query
+        self.page_size = page_size
+        self.timeout = timeout
+        self.watermark = watermark
+        self.max_pages = max_pages
+        self.max_gaps = max_gaps
+        self._window_start = None
+        self._windows = []
+        self._yielded = []
+
+    def fetch(self) -> Iterator[Dict]:
+        params = {
+            'q': self.query,
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': self.page_size,
+            'apiKey': self.api_key
+        }
+        if not self.watermark:
+            response = self.session.get(f"{NEWS_API_URL}/everything", params=params, timeout=self.timeout)
+            response.raise_for_status()
+            for article in response.json().get('articles', []):
+                yield article
+            return
+
+        start = self.watermark.read()
+        self._window_start = start
+        self._yielded = []
+        # The new window above the watermark first, then the gaps below it, newest first
+        self._windows = [{'from': start['published_at'], 'to': '', 'new': True}]
+        self._windows += [{'from': gap[0], 'to': gap[1], 'new': False} for gap in start['gaps']]
+        for window in self._windows:
+            window.update(first=0, last=0, complete=False)
+        # Without a watermark there is nothing to page back to; take the newest page only
+        budget = self.max_pages if start['published_at'] else 1
+
+        for window in self._windows:
+            window['first'] = window['last'] = len(self._yielded)
+            window_params = dict(params, **{key: window[key] for key in ('from', 'to') if window[key]})
+            page = 0
+            while budget:
+                page += 1
+                budget -= 1
+                window_params['page'] = page
+                try:
+                    response = self.session.get(f"{NEWS_API_URL}/everything", params=window_params,
+                                                timeout=self.timeout)
+                    response.raise_for_status()
+                except requests.RequestException as e:
+                    if window['new'] and page == 1:
+                        raise
+                    # NewsAPI caps how deep a query may page (HTTP 426); the rest stays a gap
+                    print(f"NewsAPI stopped paging {window['from']} to {window['to'] or 'now'}: {e}")
+                    break
+                articles = response.json().get('articles', [])
+                reached = False
+                for article in articles:
+                    published_at = article.get('publishedAt') or ''
+                    known = window['new'] and not FetchWatermark.is_newer(article, start)
+                    if known or published_at < window['from']:
+                        # Known URLs at the watermark instant may sit next to new ones; only older ones end the window
+                        reached = reached or published_at < window['from']
+                        continue
+                    self._yielded.append(article)
+                    window['last'] = len(self._yielded)
+                    yield article
+                # A first fetch has no older window to miss
+                if reached or len(articles) < self.page_size or not start['published_at']:
+                    window['complete'] = True
+                    break
+
+    def commit(self, articles: List[Dict], exhausted: bool = False) -> List[Dict]:
+        """Advance the watermark past the consumed articles and record what was left unfetched."""
+        if not self.watermark or self._window_start is None:
+            return articles
+
+        # The caller reads this source in order, so it consumed everything up to the last article it kept
+        kept = {article.get('url') for article in articles}
+        consumed = len(self._yielded) if exhausted else max(
+            (i + 1 for i, article in enumerate(self._yielded) if article.get('url') in kept), default=0
+        )
+        newest, gaps = [], []
+        for window in self._windows:
+            taken = self._yielded[window['first']:max(window['first'], min(window['last'], consumed))]
+            if window['new']:
+                newest = taken
+            if window['complete'] and len(taken) == window['last'] - window['first']:
+                continue
+            # Nothing consumed from the new window leaves the watermark where it is, so it is asked for again
+            if not window['from'] or (window['new'] and not taken):
+                continue
+            gaps.append([window['from'], (taken[-1].get('publishedAt') or '') if taken else window['to']])
+        for gap_from, gap_to in gaps[self.max_gaps:]:
+            print(f"NewsAPI: giving up on articles published from {gap_from} to {gap_to}")
+
+        current = self.watermark.advance(newest, gaps[:self.max_gaps])
+        if current == self._window_start:
+            return articles
+        # Another worker advanced the watermark after this fetch started
+        ours = {article.get('url') for article in newest}
+        return [
+            article for article in articles
+            if article.get('url') not in ours or FetchWatermark.is_newer(article, current)
+        ]
+
+
+class RSSSource(NewsSource):
+    """Articles from an RSS 2.0 or Atom feed."""
+
+    name = 'rss'
+
+    def __init__(self, url: str, session: requests.Session = None, timeout: int = 10):
+        self.url = url
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def fetch(self) -> Iterator[Dict]:
+        response = self.session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        root = ET.fromstring(response.content)
+
+        channel_title = root.findtext('channel/title') or root.findtext(f'{ATOM_NS}title') or self.url
+
+        # RSS 2.0
+        for item in root.iter('item'):
+            yield make_article(
+                item.findtext('title'),
+                item.findtext('link'),
+                item.findtext('description'),
+                item.findtext('pubDate'),
+                channel_title
+            )
+
+        # Atom
+        for entry in root.iter(f'{ATOM_NS}entry'):
+            link = entry.find(f'{ATOM_NS}link[@rel="alternate"]')
+            if link is None:
+                link = entry.find(f'{ATOM_NS}link')
+            yield make_article(
+                entry.findtext(f'{ATOM_NS}title'),
+                link.get('href') if link is not None else '',
+                entry.findtext(f'{ATOM_NS}summary') or entry.findtext(f'{ATOM_NS}content'),
+                entry.findtext(f'{ATOM_NS}updated') or entry.findtext(f'{ATOM_NS}published'),
+                channel_title
+            )
+
+
+class FileSource(NewsSource):
+    """Articles from a local JSON or NDJSON file, for offline runs.
+
+    ``.ndjson``/``.jsonl`` files are read line by line; ``.json`` files may
+    hold either a list of articles or a NewsAPI-style ``{"articles": [...]}``.
+    """
+
+    name = 'file'
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self) -> Iterator[Dict]:
+        if self.path.endswith(('.ndjson', '.jsonl')):
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+            return
+
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('articles', [])
+        for article in data:
+            yield article
+
+
+_DONE = object()
+
+
+def stream_articles(sources: Iterable[NewsSource], max_workers: int = 4,
+                    buffer_size: int = 100) -> Iterator[Dict]:
+    """Fetch all sources concurrently and yield their articles as they arrive.
+
+    Articles pass through a bounded queue, so at most ``buffer_size`` of them
+    are held in memory at once. A source that fails is logged and skipped.
+    Closing the generator early stops the remaining fetches.
+    """
+    sources = list(sources)
+    if not sources:
+        return
+
+    articles = queue.Queue(maxsize=buffer_size)
+    pending = queue.Queue()
+    for source in sources:
+        pending.put(source)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                articles.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        while not stop.is_set():
+            try:
+                source = pending.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                for article in source.fetch():
+                    if not put(article):
+                        return
+            except Exception as e:
+                print(f"Error fetching from {source.name} source: {e}")
+        put(_DONE)
+
+    workers = [
+        threading.Thread(target=worker, name=f"news-source-{i}", daemon=True)
+        for i in range(min(max_workers, len(sources)))
+    ]
+    for thread in workers:
+        thread.start()
+
+    try:
+        remaining = len(workers)
+        while remaining:
+            item = articles.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        stop.set()
+
+
+def build_sources(news_api_key: Optional[str] = None, session: requests.Session = None) -> List[NewsSource]:
+    """Build the configured sources from NEWS_API_KEY, NEWS_RSS_FEEDS and NEWS_FILE_SOURCES."""
+    sources = []
+    if news_api_key:
+        watermark = None
+        if os.getenv('NEWS_API_INCREMENTAL', 'false').lower() in ('1', 'true', 'yes'):
+            watermark = FetchWatermark(os.getenv('NEWS_API_WATERMARK_PATH', '.cache/newsapi_watermark.json'))
+        sources.append(NewsAPISource(
+            news_api_key,
+            session=session,
+            page_size=int(os.getenv('NEWS_API_PAGE_SIZE', '100')),
+            watermark=watermark,
+            max_pages=int(os.getenv('NEWS_API_MAX_PAGES', '5')),
+            max_gaps=int(os.getenv('NEWS_API_MAX_GAPS', '5'))
+        ))
+    for url in filter(None, (u.strip() for u in os.getenv('NEWS_RSS_FEEDS', '').split(','))):
+        sources.append(RSSSource(url, session=session))
+    for path in filter(None, (p.strip() for p in os.getenv('NEWS_FILE_SOURCES', '').split(','))):
+        sources.append(FileSource(path))
+    return sources
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def url_hash(url: str) -> str:
+    """Stable hash of an article URL, used as the lookup key."""
+    return hashlib.sha256(url.strip().encode('utf-8')).hexdigest()
+
+
+class PostHistory:
+    """SQLite record of every digest posted and the articles it contained.
+
+    The database runs in WAL mode so the web app, worker and scheduled job
+    can read it while a post is being recorded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS posts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    author TEXT,
+                    content TEXT NOT NULL,
+                    linkedin_post_id TEXT,
+                    posted_at TEXT NOT NULL,
+                    post_date TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS post_articles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    post_id INTEGER NOT NULL REFERENCES posts (id),
+                    position INTEGER NOT NULL,
+                    url TEXT NOT NULL,
+                    url_hash TEXT NOT NULL,
+                    title TEXT,
+                    analysis TEXT,
+                    published_at TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_post_date ON posts (post_date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_post_articles_url_hash ON post_articles (url_hash)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_post_articles_post_id ON post_articles (post_id)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record_posts(self, posts: Iterable[Dict]) -> List[int]:
+        """Bulk insert posts in one transaction.
+
+        Each post is a dict with ``content``, ``articles`` and optionally
+        ``author``, ``linkedin_post_id`` and ``posted_at``. Returns the new
+        post IDs.
+        """
+        conn = self._connect()
+        post_ids = []
+        with conn:
+            article_rows = []
+            for post in posts:
+                posted_at = post.get('posted_at') or datetime.now()
+                cursor = conn.execute(
+                    "INSERT INTO posts (author, content, linkedin_post_id, posted_at, post_date) VALUES (?, ?, ?, ?, ?)",
+                    (post.get('author'), post['content'], post.get('linkedin_post_id'),
+                     posted_at.isoformat(), posted_at.date().isoformat())
+                )
+                post_id = cursor.lastrowid
+                post_ids.append(post_id)
+                for position, article in enumerate(post.get('articles', [])):
+                    article_rows.append((
+                        post_id, position, article['url'], url_hash(article['url']), article.get('title'),
+                        json.dumps(article.get('analysis')) if article.get('analysis') else None,
+                        article.get('publishedAt')
+                    ))
+            conn.executemany(
+                "INSERT INTO post_articles (post_id, position, url, url_hash, title, analysis, published_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                article_rows
+            )
+        return post_ids
+
+    def record_post(self, content: str, articles: List[Dict], linkedin_post_id: Optional[str] = None,
+                    author: Optional[str] = None) -> int:
+        """Record a single posted digest and return its ID."""
+        return self.record_posts([{
+            'content': content,
+            'articles': articles,
+            'linkedin_post_id': linkedin_post_id,
+            'author': author
+        }])[0]
+
+    def posted_urls(self, urls: Iterable[str]) -> Set[str]:
+        """Return the subset of ``urls`` that have already been posted, in one query."""
+        hashes = {url_hash(url): url for url in urls}
+        if not hashes:
+            return set()
+        rows = self._connect().execute(
+            "SELECT DISTINCT url_hash FROM post_articles WHERE url_hash IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(hashes)),)
+        )
+        return {hashes[row['url_hash']] for row in rows}
+
+    def posts_on(self, date: str) -> List[Dict]:
+        """Return the posts made on a given ``YYYY-MM-DD`` date."""
+        rows = self._connect().execute(
+            "SELECT * FROM posts WHERE post_date = ? ORDER BY posted_at", (date,)
+        )
+        return [dict(row) for row in rows]
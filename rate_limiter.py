@@ -0,0 +1,289 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+from metrics import REGISTRY
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts only get per-process limiting
+    fcntl = None
+
+# Longest a request waits for a token before failing; keeps web requests inside gunicorn's timeout
+DEFAULT_MAX_WAIT = 10.0
+
+# Requests per second and burst size for each upstream
+DEFAULT_LIMITS = {
+    'newsapi': (1.0, 5),
+    'deepseek': (5.0, 10),
+    'linkedin': (2.0, 10),
+    'blob': (20.0, 40),
+    # User record downloads in get_all_users, kept apart from index reads and writes
+    'blob_read': (50.0, 100),
+}
+
+
+def _default_state_dir() -> str:
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the number of seconds a Retry-After header asks us to wait."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket whose state is shared by every thread and process on the host.
+
+    The bucket lives in a small JSON file guarded by an ``flock``, so gunicorn
+    workers, the scheduler and ``worker.py`` all draw from the same budget.
+    Responses can push the bucket into a cool-down when the upstream sends
+    ``Retry-After`` or reports an exhausted ``X-RateLimit-*`` budget.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: int, state_dir: str = None):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        state_dir = state_dir or os.getenv('RATE_LIMIT_STATE_DIR') or _default_state_dir()
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, f"linkedin_ai_news-ratelimit-{name}.json")
+        self._thread_lock = threading.Lock()
+
+    def _locked(self, update):
+        """Run ``update(state)`` on the shared state while holding the file lock."""
+        with self._thread_lock:
+            with open(self.path, 'a+') as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    raw = f.read()
+                    try:
+                        state = json.loads(raw) if raw else {}
+                    except ValueError:
+                        state = {}
+                    now = time.time()
+                    tokens = state.get('tokens', self.capacity)
+                    updated = state.get('updated', now)
+                    state['tokens'] = min(self.capacity, tokens + (now - updated) * self.rate)
+                    state['updated'] = now
+                    result = update(state, now)
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                    return result
+                finally:
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Take ``tokens`` if available; otherwise return how long to wait before retrying."""
+        def update(state, now):
+            blocked_until = state.get('blocked_until', 0)
+            if now < blocked_until:
+                return blocked_until - now
+            if state['tokens'] >= tokens:
+                state['tokens'] -= tokens
+                return 0.0
+            return (tokens - state['tokens']) / self.rate
+        return self._locked(update)
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """Block until ``tokens`` are available. Returns False if ``timeout`` expires first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+            # Fail now rather than sleep through a wait that cannot end in time
+            if deadline is not None and wait > deadline - time.monotonic():
+                return False
+            time.sleep(wait)
+
+    def update_from_response(self, response):
+        """Apply Retry-After and X-RateLimit-* headers from an upstream response."""
+        headers = response.headers
+        retry_after = parse_retry_after(headers.get('Retry-After'))
+        remaining = headers.get('X-RateLimit-Remaining') or headers.get('X-Ratelimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset') or headers.get('X-Ratelimit-Reset')
+        if retry_after is None and remaining is None and response.status_code != 429:
+            return
+
+        def update(state, now):
+            blocked_until = state.get('blocked_until', 0)
+            if retry_after is not None:
+                blocked_until = max(blocked_until, now + retry_after)
+            elif response.status_code == 429:
+                # Throttled without guidance: back off for one token interval
+                blocked_until = max(blocked_until, now + 1.0 / self.rate)
+            if remaining is not None:
+                try:
+                    remaining_count = float(remaining)
+                except ValueError:
+                    remaining_count = None
+                if remaining_count is not None:
+                    state['upstream_remaining'] = remaining_count
+                    state['tokens'] = min(state['tokens'], remaining_count)
+                    if remaining_count <= 0 and reset:
+                        try:
+                            reset_value = float(reset)
+                            # Reset is either an epoch timestamp or seconds from now
+                            reset_at = reset_value if reset_value > 1e9 else now + reset_value
+                            blocked_until = max(blocked_until, reset_at)
+                        except ValueError:
+                            pass
+            state['blocked_until'] = blocked_until
+        self._locked(update)
+
+    def budget(self) -> Dict:
+        """Return the current shared budget for this upstream."""
+        def update(state, now):
+            return {
+                'name': self.name,
+                'tokens': round(state['tokens'], 3),
+                'capacity': self.capacity,
+                'rate': self.rate,
+                'blocked_for': round(max(0.0, state.get('blocked_until', 0) - now), 3),
+                'upstream_remaining': state.get('upstream_remaining')
+            }
+        return self._locked(update)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def rate_limiting_enabled() -> bool:
+    return os.getenv('RATE_LIMIT_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+
+def get_limiter(name: str) -> TokenBucket:
+    """Return the process-wide limiter for an upstream, configured from the environment."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            default_rate, default_burst = DEFAULT_LIMITS.get(name, (5.0, 10))
+            prefix = f"RATE_LIMIT_{name.upper()}"
+            limiter = TokenBucket(
+                name,
+                rate=float(os.getenv(f"{prefix}_RATE", default_rate)),
+                capacity=int(os.getenv(f"{prefix}_BURST", default_burst))
+            )
+            _limiters[name] = limiter
+        return limiter
+
+
+def rate_limit_status() -> Dict[str, Dict]:
+    """Return the current budget of every upstream."""
+    return {name: get_limiter(name).budget() for name in DEFAULT_LIMITS}
+
+
+def render_rate_limit_metrics():
+    """Expose the shared budgets as gauges, so /metrics shows when an upstream is being throttled."""
+    if not rate_limiting_enabled():
+        return []
+    gauges = [
+        ('rate_limit_tokens', 'Tokens left in the host-wide rate limit bucket', 'tokens'),
+        ('rate_limit_blocked_seconds', 'Seconds until the upstream accepts requests again', 'blocked_for'),
+    ]
+    status = rate_limit_status()
+    lines = []
+    for name, help_text, field in gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{upstream="{upstream}"}} {budget[field]}' for upstream, budget in sorted(status.items())]
+    return lines
+
+
+REGISTRY.collector(render_rate_limit_metrics)
+
+
+class RateLimitExceeded(requests.exceptions.ConnectionError):
+    """The upstream's budget would not free up within the adapter's ``max_wait``."""
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that takes a token from an upstream's bucket before each request.
+
+    Retries from ``max_retries`` run here rather than inside urllib3, so every
+    attempt draws a token too. No attempt waits longer than ``max_wait``
+    (``RATE_LIMIT_<NAME>_MAX_WAIT`` or ``RATE_LIMIT_MAX_WAIT``) for a token or
+    a Retry-After; past that the request fails with ``RateLimitExceeded``.
+    """
+
+    def __init__(self, limiter_name: str, *args, max_wait: float = None, **kwargs):
+        self.limiter_name = limiter_name
+        if max_wait is None:
+            max_wait = float(os.getenv(f"RATE_LIMIT_{limiter_name.upper()}_MAX_WAIT",
+                                       os.getenv('RATE_LIMIT_MAX_WAIT', DEFAULT_MAX_WAIT)))
+        self.max_wait = max_wait
+        super().__init__(*args, **kwargs)
+        self.retry_policy = self.max_retries
+        self.max_retries = Retry(0, read=False)
+
+    def _send_once(self, request, *args, **kwargs):
+        if not rate_limiting_enabled():
+            return super().send(request, *args, **kwargs)
+        limiter = get_limiter(self.limiter_name)
+        if not limiter.acquire(timeout=self.max_wait):
+            raise RateLimitExceeded(f"{self.limiter_name} rate limit: no token within {self.max_wait:g}s",
+                                    request=request)
+        response = super().send(request, *args, **kwargs)
+        try:
+            limiter.update_from_response(response)
+        except Exception as e:
+            print(f"Error updating {self.limiter_name} rate limit: {e}")
+        return response
+
+    def send(self, request, *args, **kwargs):
+        retries = self.retry_policy
+        while True:
+            try:
+                response = self._send_once(request, *args, **kwargs)
+            except RateLimitExceeded:
+                raise
+            except requests.exceptions.RequestException as e:
+                # requests wraps the urllib3 error, either directly or inside a MaxRetryError
+                error = e.args[0] if e.args else None
+                error = getattr(error, 'reason', error)
+                if not isinstance(error, Exception):
+                    raise
+                try:
+                    retries = retries.increment(request.method, request.url, error=error)
+                except Exception:
+                    raise e
+                retries.sleep()
+                continue
+
+            has_retry_after = 'Retry-After' in response.headers
+            if not retries.is_retry(request.method, response.status_code, has_retry_after):
+                return response
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None and retry_after > self.max_wait:
+                return response
+            try:
+                retries = retries.increment(request.method, request.url, response=response.raw)
+            except MaxRetryError:
+                return response
+            response.raw.drain_conn()
+            response.close()
+            retries.sleep(response.raw)
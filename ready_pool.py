@@ -0,0 +1,86 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Set
+
+
+class ReadyPool:
+    """Analyzed candidate articles kept ready for the next scheduled post.
+
+    The background ingestion job adds articles as they are analyzed; the
+    scheduled job ranks a snapshot of the pool and publishes from it without
+    calling DeepSeek. Articles older than ``max_age_hours`` in the pool are
+    dropped, and when the pool is full the oldest additions go first. The
+    pool lives in SQLite so every worker process sees the same articles.
+    """
+
+    def __init__(self, path: str = '.cache/ready_pool.db', max_size: int = 50, max_age_hours: float = 24):
+        self.path = path
+        self.max_size = max_size
+        self.max_age_seconds = max_age_hours * 3600
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ready_articles (
+                    url TEXT PRIMARY KEY,
+                    article TEXT NOT NULL,
+                    added_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ready_articles_added_at ON ready_articles (added_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM ready_articles WHERE added_at < ?", (now - self.max_age_seconds,))
+        conn.execute("""
+            DELETE FROM ready_articles WHERE url NOT IN (
+                SELECT url FROM ready_articles ORDER BY added_at DESC LIMIT ?
+            )
+        """, (self.max_size,))
+
+    def urls(self) -> Set[str]:
+        conn = self._connect()
+        cutoff = time.time() - self.max_age_seconds
+        return {row[0] for row in conn.execute("SELECT url FROM ready_articles WHERE added_at >= ?", (cutoff,))}
+
+    def add(self, articles: Iterable[Dict]):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO ready_articles (url, article, added_at) VALUES (?, ?, ?)",
+                [(article['url'], json.dumps(article, ensure_ascii=False), now) for article in articles]
+            )
+            self._prune(conn, now)
+
+    def snapshot(self) -> List[Dict]:
+        """Return the pooled articles, oldest addition first."""
+        conn = self._connect()
+        cutoff = time.time() - self.max_age_seconds
+        rows = conn.execute(
+            "SELECT article FROM ready_articles WHERE added_at >= ? ORDER BY added_at, url", (cutoff,)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def remove(self, urls: Iterable[str]):
+        conn = self._connect()
+        with conn:
+            conn.executemany("DELETE FROM ready_articles WHERE url = ?", [(url,) for url in urls])
+
+    def __len__(self):
+        conn = self._connect()
+        cutoff = time.time() - self.max_age_seconds
+        return conn.execute("SELECT COUNT(*) FROM ready_articles WHERE added_at >= ?", (cutoff,)).fetchone()[0]
@@ -0,0 +1,206 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import urllib.parse
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Query parameters that carry credentials and never go into fixtures
+REDACTED_PARAMS = {'apikey', 'api_key', 'key', 'token', 'access_token'}
+
+# Response headers worth keeping in fixtures
+RECORDED_HEADERS = {
+    'content-type', 'retry-after', 'x-restli-id', 'etag', 'last-modified',
+    'x-ratelimit-remaining', 'x-ratelimit-reset', 'x-ratelimit-limit',
+}
+
+
+def normalize_url(url: str) -> str:
+    """Drop credential query parameters and sort the rest so URLs match across runs."""
+    parts = urllib.parse.urlsplit(url)
+    query = sorted(
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in REDACTED_PARAMS
+    )
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc, parts.path, urllib.parse.urlencode(query), ''))
+
+
+def body_hash(body) -> str:
+    if body is None:
+        return ''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def _encode_body(content: bytes) -> Dict:
+    try:
+        return {'body': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'body_b64': base64.b64encode(content).decode('ascii')}
+
+
+def _decode_body(interaction: Dict) -> bytes:
+    if 'body_b64' in interaction:
+        return base64.b64decode(interaction['body_b64'])
+    return interaction.get('body', '').encode('utf-8')
+
+
+class RecordingAdapter(BaseAdapter):
+    """Wraps a real adapter and appends every request/response pair to a fixture file.
+
+    Fixtures are NDJSON, one interaction per line, with credentials stripped
+    from URLs and request headers left out entirely.
+    """
+
+    def __init__(self, inner: BaseAdapter, fixture_path: str):
+        super().__init__()
+        self.inner = inner
+        self.fixture_path = fixture_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(fixture_path))
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        content = response.content
+        interaction = {
+            'method': request.method,
+            'url': normalize_url(request.url),
+            'body_hash': body_hash(request.body),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() in RECORDED_HEADERS},
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+        interaction.update(_encode_body(content))
+        with self._lock:
+            with open(self.fixture_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(interaction, separators=(',', ':')) + '\n')
+        return response
+
+    def close(self):
+        self.inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serves recorded responses instead of touching the network.
+
+    Requests are matched on method, normalized URL and body hash; if no
+    exact body match is left, the next recording for the same method and URL
+    is used, so payloads that embed the date still replay. Recordings for a
+    key are served in order and the last one repeats once exhausted.
+    ``latency_ms`` adds a fixed delay per request, or pass ``None`` to replay
+    the latency captured at record time.
+    """
+
+    def __init__(self, fixture_path: str, latency_ms: Optional[float] = 0.0):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self._lock = threading.Lock()
+        self._exact = defaultdict(deque)
+        self._by_url = defaultdict(deque)
+        self._last = {}
+        with open(fixture_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                interaction = json.loads(line)
+                self._exact[(interaction['method'], interaction['url'], interaction['body_hash'])].append(interaction)
+                self._by_url[(interaction['method'], interaction['url'])].append(interaction)
+
+    def _next(self, request) -> Optional[Dict]:
+        url = normalize_url(request.url)
+        url_key = (request.method, url)
+        with self._lock:
+            exact = self._exact.get((request.method, url, body_hash(request.body)))
+            interaction = None
+            if exact:
+                interaction = exact.popleft()
+                try:
+                    self._by_url[url_key].remove(interaction)
+                except ValueError:
+                    pass
+            elif self._by_url.get(url_key):
+                interaction = self._by_url[url_key].popleft()
+            if interaction is None:
+                return self._last.get(url_key)
+            self._last[url_key] = interaction
+            return interaction
+
+    def send(self, request, **kwargs):
+        interaction = self._next(request)
+        if interaction is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {request.method} {normalize_url(request.url)}", request=request
+            )
+
+        delay = interaction.get('elapsed_ms', 0) if self.latency_ms is None else self.latency_ms
+        if delay:
+            time.sleep(delay / 1000)
+
+        content = _decode_body(interaction)
+        response = requests.Response()
+        response.status_code = interaction['status']
+        response.reason = interaction.get('reason')
+        response.headers = CaseInsensitiveDict(interaction.get('headers', {}))
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        response.raw = io.BytesIO(content)
+        response._content = content
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        pass
+
+
+def transport_mode() -> str:
+    return os.getenv('HTTP_TRANSPORT_MODE', '').lower()
+
+
+_replay_adapters = {}
+_replay_lock = threading.Lock()
+
+
+def _shared_replay_adapter(fixture_path: str) -> ReplayAdapter:
+    """One replay adapter per fixture, so every session consumes the same recordings."""
+    with _replay_lock:
+        adapter = _replay_adapters.get(fixture_path)
+        if adapter is None:
+            latency = os.getenv('HTTP_REPLAY_LATENCY_MS', '0')
+            adapter = ReplayAdapter(fixture_path, latency_ms=None if latency == 'recorded' else float(latency))
+            _replay_adapters[fixture_path] = adapter
+        return adapter
+
+
+def install_transport(session: requests.Session, mode: str = None, fixture_path: str = None) -> requests.Session:
+    """Switch a session to record or replay mode according to HTTP_TRANSPORT_MODE.
+
+    ``record`` wraps each mounted adapter so traffic is captured to
+    HTTP_FIXTURE_PATH; ``replay`` replaces them with recorded responses.
+    Any other value leaves the session untouched.
+    """
+    mode = (mode or transport_mode())
+    if mode not in ('record', 'replay'):
+        return session
+    fixture_path = fixture_path or os.getenv('HTTP_FIXTURE_PATH', 'fixtures/http_fixture.ndjson')
+
+    for prefix, adapter in list(session.adapters.items()):
+        if mode == 'record':
+            if not isinstance(adapter, RecordingAdapter):
+                session.adapters[prefix] = RecordingAdapter(adapter, fixture_path)
+        else:
+            session.adapters[prefix] = _shared_replay_adapter(fixture_path)
+    return session
@@ -0,0 +1,83 @@
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+# Stages in the order run() completes them
+STAGES = ('fetched', 'analyzed', 'formatted', 'posted')
+
+
+class CheckpointStore:
+    """Keeps each run's stage outputs on disk so a failed run can resume.
+
+    Every run is one JSON file named after its run ID, rewritten atomically
+    as stages complete. Checkpoints older than ``ttl_seconds`` are deleted
+    whenever the store is written to.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int = 6 * 3600):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def new_run_id() -> str:
+        return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    def _path(self, run_id: str) -> str:
+        if not run_id or os.sep in run_id or run_id.startswith('.'):
+            raise ValueError(f"Invalid run ID: {run_id}")
+        return os.path.join(self.directory, f"{run_id}.json")
+
+    def load(self, run_id: str) -> Optional[Dict]:
+        """Return the checkpoint for ``run_id``, or None if it is missing or expired."""
+        path = self._path(run_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def latest_incomplete(self) -> Optional[str]:
+        """Return the ID of the most recent unexpired run that has not posted yet."""
+        candidates = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            run_id = name[:-len('.json')]
+            checkpoint = self.load(run_id)
+            if checkpoint and 'posted' not in checkpoint.get('completed', []):
+                candidates.append((checkpoint.get('updated_at', ''), run_id))
+        return max(candidates)[1] if candidates else None
+
+    def save(self, run_id: str, stage: str, checkpoint: Dict, value) -> Dict:
+        """Record the output of ``stage`` and write the checkpoint atomically."""
+        checkpoint[stage] = value
+        completed = checkpoint.setdefault('completed', [])
+        if stage not in completed:
+            completed.append(stage)
+        checkpoint['run_id'] = run_id
+        checkpoint['updated_at'] = datetime.now().isoformat()
+
+        path = self._path(run_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.prune()
+        return checkpoint
+
+    def prune(self):
+        """Delete expired checkpoints."""
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith('.json') and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
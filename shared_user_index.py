@@ -0,0 +1,265 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+from bloom_filter import BloomFilter, item_digest
+from user_index_cache import index_counters
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts fall back to the per-process cache
+    fcntl = None
+
+MAGIC = b'LAUIDX03'
+ETAG_SIZE = 128
+# magic, entry count, Bloom filter bits and hash count, ETag (NUL padded), offset and length of the counters JSON
+HEADER = struct.Struct(f'<8sIII{ETAG_SIZE}sII')
+# email hash, offset and length of "email\npath" in the string area
+ENTRY = struct.Struct('<16sII')
+
+
+email_hash = item_digest
+
+
+def encode_index(index: Dict, etag: Optional[str] = None, fp_rate: float = 0.01) -> bytes:
+    """Serialize a users index into the shared layout: header, Bloom filter, sorted hash table, strings, counters."""
+    paths = dict(index.get('paths') or {})
+    for email in index.get('emails') or []:
+        paths.setdefault(email, '')
+    records = sorted((email_hash(email), f"{email}\n{path}".encode('utf-8')) for email, path in paths.items())
+    bloom = BloomFilter.for_items(paths, fp_rate=fp_rate)
+    bloom_bytes = bloom.to_bytes()
+
+    table = []
+    strings = []
+    offset = HEADER.size + len(bloom_bytes) + ENTRY.size * len(records)
+    for digest, record in records:
+        table.append(ENTRY.pack(digest, offset, len(record)))
+        strings.append(record)
+        offset += len(record)
+    counters = json.dumps(index_counters(index), separators=(',', ':')).encode('utf-8')
+    # An ETag too long to store is dropped, which only costs a full download on revalidation
+    etag_bytes = (etag or '').encode('utf-8')
+    if len(etag_bytes) > ETAG_SIZE:
+        etag_bytes = b''
+    header = HEADER.pack(MAGIC, len(records), bloom.num_bits, bloom.num_hashes, etag_bytes, offset, len(counters))
+    return header + bloom_bytes + b''.join(table) + b''.join(strings) + counters
+
+
+class SharedUserIndex:
+    """Users index shared by every worker on a host through one file in /dev/shm.
+
+    The file holds a Bloom filter of registered emails, a sorted table of
+    16-byte email hashes, the emails and blob paths, and the index counters. Each worker maps it
+    read-only, so a lookup is a Bloom check and a binary search over shared
+    pages with no per-worker copy. Whichever
+    worker first finds the file older than ``ttl_seconds`` takes an
+    ``flock`` and revalidates it with the stored ETag; the others keep
+    reading the current file meanwhile. Writers publish a new file with
+    ``os.replace``, so readers never see a partial index. The interface
+    matches ``UserIndexCache``.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 30, fp_rate: float = 0.01,
+                 negative_ttl_seconds: float = 2):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.fp_rate = fp_rate
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._map = None
+        self._bloom = None
+        self._table_offset = HEADER.size
+        self._inode = None
+        self._count = 0
+        self._counters = (0, 0)
+        self._etag = None
+        self._mtime = 0.0
+        self.stats = {'hits': 0, 'revalidated': 0, 'downloads': 0, 'errors': 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _refresh_view(self) -> bool:
+        """Map the current file if it was replaced since the last call; False if there is no usable one."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        self._mtime = st.st_mtime
+        if st.st_ino == self._inode and self._map is not None:
+            return True
+        with open(self.path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, bloom_bits, bloom_hashes, etag, counters_offset, counters_length = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            # Left by an older release; treated as missing so the next refresh rewrites it
+            mapped.close()
+            return False
+        if self._map is not None:
+            # The old filter's view must be released before its map can be closed
+            self._bloom.bits.release()
+            self._map.close()
+        bloom_size = (bloom_bits + 7) // 8
+        self._bloom = BloomFilter(bloom_bits, bloom_hashes, memoryview(mapped)[HEADER.size:HEADER.size + bloom_size])
+        self._table_offset = HEADER.size + bloom_size
+        self._map, self._inode, self._count = mapped, st.st_ino, count
+        self._counters = (counters_offset, counters_length)
+        self._etag = etag.rstrip(b'\0').decode('utf-8') or None
+        return True
+
+    def _record(self, email: str, digest: Optional[bytes] = None) -> Optional[bytes]:
+        digest = digest or email_hash(email)
+        mapped = self._map
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self._table_offset + mid * ENTRY.size
+            if mapped[start:start + 16] < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < self._count:
+            entry_digest, offset, length = ENTRY.unpack_from(mapped, self._table_offset + lo * ENTRY.size)
+            if entry_digest != digest:
+                break
+            record = mapped[offset:offset + length]
+            if record.split(b'\n', 1)[0] == email.encode('utf-8'):
+                return record
+            lo += 1
+        return None
+
+    def _read_counters(self) -> Dict:
+        offset, length = self._counters
+        return json.loads(self._map[offset:offset + length].decode('utf-8'))
+
+    def _write(self, index: Dict, etag: Optional[str]):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(encode_index(index, etag, self.fp_rate))
+        os.replace(tmp_path, self.path)
+
+    def _revalidate(self, fetch: Callable[[Dict], requests.Response], force: bool):
+        """Refresh the shared file under the host-wide lock, unless another worker just did."""
+        with open(f"{self.path}.lock", 'a') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                started = time.time()
+                has_view = self._refresh_view()
+                if has_view and started - self._mtime < (1.0 if force else self.ttl_seconds):
+                    return
+                headers = {'If-None-Match': self._etag} if has_view and self._etag else {}
+                try:
+                    response = fetch(headers)
+                except Exception as e:
+                    print(f"Error revalidating users index: {e}")
+                    self.stats['errors'] += 1
+                    return
+                if response.status_code == 304 and has_view:
+                    self.stats['revalidated'] += 1
+                    os.utime(self.path)
+                elif response.status_code == 200:
+                    try:
+                        index = response.json()
+                    except ValueError as e:
+                        print(f"Error parsing users index: {e}")
+                        self.stats['errors'] += 1
+                        return
+                    self.stats['downloads'] += 1
+                    self._write(index if isinstance(index, dict) else {}, response.headers.get('ETag'))
+                else:
+                    self.stats['errors'] += 1
+                self._refresh_view()
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def is_fresh(self) -> bool:
+        with self._lock:
+            return self._refresh_view() and time.time() - self._mtime < self.ttl_seconds
+
+    def _ensure(self, fetch, force: bool) -> bool:
+        if not force and self._refresh_view() and time.time() - self._mtime < self.ttl_seconds:
+            self.stats['hits'] += 1
+            return True
+        self._revalidate(fetch, force)
+        return self._map is not None
+
+    def get(self, fetch: Callable[[Dict], requests.Response], force: bool = False) -> Optional[Dict]:
+        """Return the index as a dict; used for writes and start-up, not per-request lookups."""
+        with self._lock:
+            if not self._ensure(fetch, force):
+                return None
+            paths = {}
+            for i in range(self._count):
+                _, offset, length = ENTRY.unpack_from(self._map, self._table_offset + i * ENTRY.size)
+                email, _, path = self._map[offset:offset + length].decode('utf-8').partition('\n')
+                paths[email] = path
+            return {'emails': list(paths), 'paths': paths, 'stats': self._read_counters()}
+
+    def contains(self, email: str) -> bool:
+        with self._lock:
+            return self._refresh_view() and self._record(email) is not None
+
+    def counters(self, fetch: Callable[[Dict], requests.Response]) -> Optional[Dict]:
+        """User total and registrations per day, read from the shared file without decoding the table."""
+        with self._lock:
+            if not self._ensure(fetch, False):
+                return None
+            return self._read_counters()
+
+    def might_contain(self, email: str, fetch: Callable[[Dict], requests.Response]) -> bool:
+        """False only if ``email`` is definitely not registered; True when unsure or unavailable."""
+        with self._lock:
+            if not self._ensure(fetch, False):
+                return True
+            if not self._bloom.might_contain(email) and time.time() - self._mtime >= self.negative_ttl_seconds:
+                # Revalidate before answering no; a 304 is cheap next to telling a new user to register again
+                self._revalidate(fetch, True)
+            return self._bloom.might_contain(email)
+
+    def path_for(self, email: str) -> Optional[str]:
+        with self._lock:
+            record = self._record(email) if self._refresh_view() else None
+        return record.decode('utf-8').partition('\n')[2] if record is not None else None
+
+    def lookup(self, email: str, fetch: Callable[[Dict], requests.Response]) -> Optional[bool]:
+        """Whether ``email`` is in the index, or None if the index is unavailable.
+
+        A miss answered from a fresh file is revalidated once, so a user
+        registered through another host is still found.
+        """
+        with self._lock:
+            served_from_file = self._refresh_view() and time.time() - self._mtime < self.ttl_seconds
+            if not self._ensure(fetch, False):
+                return None
+            if self._record(email) is not None:
+                return True
+            if served_from_file:
+                self._revalidate(fetch, True)
+            return self._record(email) is not None
+
+    def update(self, index: Dict):
+        """Publish an index this process just wrote to blob storage to every worker."""
+        with self._lock:
+            with open(f"{self.path}.lock", 'a') as lock:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    self._write(index, None)
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock, fcntl.LOCK_UN)
+            self._refresh_view()
+
+    def invalidate(self):
+        with self._lock:
+            try:
+                os.utime(self.path, (0, 0))
+            except FileNotFoundError:
+                pass
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 import requests
+from replay_transport import install_transport
 
 # Load environment variables
 load_dotenv()
@@ -34,7 +35,8 @@ def test_deepseek_api():
 
     try:
         print("Testing DeepSeek API connection...")
-        response = requests.post(
+        session = install_transport(requests.Session())
+        response = session.post(
             'https://api.deepseek.com/v1/chat/completions',
             headers=headers,
             json=data
@@ -1,6 +1,7 @@
 import os
 import requests
 from dotenv import load_dotenv
+from replay_transport import install_transport
 
 # Load environment variables
 load_dotenv()
@@ -36,7 +37,8 @@ def test_linkedin_post():
     }
     
     # Send the request
-    response = requests.post(
+    session = install_transport(requests.Session())
+    response = session.post(
         'https://api.linkedin.com/v2/ugcPosts',
         headers=headers,
         json=post_data
@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+from bloom_filter import BloomFilter
+
+
+def index_counters(index: Optional[Dict]) -> Dict:
+    """Aggregate counters kept in the index; an index written before they existed only has a total."""
+    index = index or {}
+    counters = index.get('stats') or {}
+    total = counters.get('total')
+    if total is None:
+        total = len(index.get('paths') or index.get('emails') or [])
+    return {'total': total, 'daily': dict(counters.get('daily') or {})}
+
+
+class UserIndexCache:
+    """In-process copy of the users index, revalidated with a conditional GET.
+
+    Within ``ttl_seconds`` of the last fetch the cached index is served
+    without a network call. After that the next lookup sends
+    ``If-None-Match`` with the stored ETag; a 304 just restarts the TTL, and
+    only a changed index is downloaded again. If revalidation fails, the last
+    good copy is served. A Bloom negative is only trusted from a copy
+    revalidated within ``negative_ttl_seconds``, since a user registered
+    elsewhere since then would be missed.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, fp_rate: float = 0.01, negative_ttl_seconds: float = 2):
+        self.ttl_seconds = ttl_seconds
+        self.fp_rate = fp_rate
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._index = None
+        self._emails = frozenset()
+        self._bloom = None
+        self._etag = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'downloads': 0, 'errors': 0}
+
+    def is_fresh(self) -> bool:
+        return self._index is not None and time.monotonic() - self._fetched_at < self.ttl_seconds
+
+    def get(self, fetch: Callable[[Dict], requests.Response], force: bool = False) -> Optional[Dict]:
+        """Return the index, calling ``fetch(extra_headers)`` only when the copy is stale or ``force``."""
+        with self._lock:
+            if not force and self.is_fresh():
+                self.stats['hits'] += 1
+                return self._index
+
+            headers = {'If-None-Match': self._etag} if self._etag and self._index is not None else {}
+            try:
+                response = fetch(headers)
+            except Exception as e:
+                print(f"Error revalidating users index: {e}")
+                self.stats['errors'] += 1
+                return self._index
+
+            if response.status_code == 304 and self._index is not None:
+                self.stats['revalidated'] += 1
+                self._fetched_at = time.monotonic()
+                return self._index
+            if response.status_code == 200:
+                try:
+                    index = response.json()
+                except ValueError as e:
+                    print(f"Error parsing users index: {e}")
+                    self.stats['errors'] += 1
+                    return self._index
+                self.stats['downloads'] += 1
+                self._set(index, response.headers.get('ETag'))
+                return self._index
+
+            self.stats['errors'] += 1
+            return self._index
+
+    def _set(self, index: Dict, etag: Optional[str]):
+        if not isinstance(index, dict):
+            index = {}
+        self._index = index
+        self._emails = frozenset(index.get('emails') or index.get('paths', {}).keys())
+        self._bloom = BloomFilter.for_items(self._emails, fp_rate=self.fp_rate)
+        self._etag = etag
+        self._fetched_at = time.monotonic()
+
+    def update(self, index: Dict):
+        """Replace the cached index after this process wrote it; the next revalidation downloads it."""
+        with self._lock:
+            self._set(index, None)
+
+    def contains(self, email: str) -> bool:
+        return email in self._emails
+
+    def counters(self, fetch: Callable[[Dict], requests.Response]) -> Optional[Dict]:
+        """User total and registrations per day, or None if the index is unavailable."""
+        index = self.get(fetch)
+        return index_counters(index) if index is not None else None
+
+    def might_contain(self, email: str, fetch: Callable[[Dict], requests.Response]) -> bool:
+        """False only if ``email`` is definitely not registered; True when unsure or unavailable."""
+        if self.get(fetch) is None:
+            return True
+        if not self._bloom.might_contain(email) and time.monotonic() - self._fetched_at >= self.negative_ttl_seconds:
+            # Revalidate before answering no; a 304 is cheap next to telling a new user to register again
+            self.get(fetch, force=True)
+        return self._bloom.might_contain(email)
+
+    def lookup(self, email: str, fetch: Callable[[Dict], requests.Response]) -> Optional[bool]:
+        """Whether ``email`` is in the index, or None if the index is unavailable.
+
+        A miss answered from memory is revalidated once, so a user registered
+        by another process within the TTL is still found.
+        """
+        served_from_memory = self.is_fresh()
+        if self.get(fetch) is None:
+            return None
+        if email in self._emails:
+            return True
+        if served_from_memory:
+            self.get(fetch, force=True)
+        return email in self._emails
+
+    def invalidate(self):
+        with self._lock:
+            self._fetched_at = 0.0
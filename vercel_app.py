@@ -3,7 +3,8 @@ from flask_cors import CORS
 import os
 import json
 from database import Database
-import requests
+from deepseek_client import get_deepseek_client
+from metrics import instrument_flask
 from dotenv import load_dotenv
 import logging
 
@@ -17,6 +18,7 @@ load_dotenv()
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
+instrument_flask(app)
 
 # Initialize database
 print("\n=== Vercel App Initialization ===")
@@ -91,11 +93,6 @@ def chat():
         if not deepseek_api_key:
             return jsonify({"error": "DeepSeek API key not configured"}), 500
             
-        headers = {
-            "Authorization": f"Bearer {deepseek_api_key}",
-            "Content-Type": "application/json"
-        }
-        
         system_prompt = """You are Nova, the friendly and professional AI assistant for LinkedIn AI News Poster.
 Your personality traits:
 - Professional yet approachable
@@ -120,16 +117,12 @@ Remember to:
 3. Sign with "Nova 🚀"
 4. Maintain a consistent personality"""
         
-        response = requests.post(
-            "https://api.deepseek.com/v1/chat/completions",
-            headers=headers,
-            json={
-                "model": "deepseek-chat",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
-            }
+        response = get_deepseek_client(deepseek_api_key).chat_completion(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            model="deepseek-chat"
         )
         
         print(f"DeepSeek API Response Status: {response.status_code}")
@@ -174,8 +167,8 @@ def get_user_count():
         return jsonify({"error": "Database service is currently unavailable. Please try again later."}), 503
         
     try:
-        count = db.get_user_count()
-        return jsonify({"count": count}), 200
+        counters = db.get_user_counters() or {'total': 0, 'daily': {}}
+        return jsonify({"count": counters['total'], "daily": counters['daily']}), 200
     except Exception as e:
         logger.error(f"Error in get_user_count endpoint: {e}")
         return jsonify({"error": str(e)}), 500
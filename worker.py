@@ -1,6 +1,8 @@
 import os
-from ai_news_poster import AINewsPoster
-import schedule
+from job_handlers import HANDLERS, JOB_QUEUE_PATH
+from job_queue import JobQueue, WorkerPool
+from job_scheduler import DailySchedule, Scheduler
+import threading
 import time
 from datetime import datetime
 import signal
@@ -10,26 +12,74 @@ def signal_handler(sig, frame):
     print("\nShutting down gracefully...")
     sys.exit(0)
 
+READY_POOL_ENABLED = os.getenv('READY_POOL_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+POOL_REFRESH_MINUTES = float(os.getenv('POOL_REFRESH_MINUTES', '60'))
+POOL_ANALYZE_TOP = int(os.getenv('POOL_ANALYZE_TOP', '3'))
+POST_TIME = os.getenv('POST_TIME', '09:00')
+POST_TIMEZONE = os.getenv('POST_TIMEZONE', 'UTC')
+SCHEDULER_STATE_PATH = os.getenv('SCHEDULER_STATE_PATH', '.cache/scheduler.db')
+# After a restart, post once for a missed slot unless it is more than this late
+SCHEDULER_CATCH_UP = os.getenv('SCHEDULER_CATCH_UP', 'latest')
+SCHEDULER_MAX_LATENESS_HOURS = float(os.getenv('SCHEDULER_MAX_LATENESS_HOURS', '3'))
+WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', '0')) or None
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '60'))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv('JOB_RETRY_BACKOFF_SECONDS', '30'))
+
+def ingest_loop(queue, stop):
+    """Queue a ready-pool refresh every POOL_REFRESH_MINUTES, keeping analyzed candidates ready."""
+    interval = POOL_REFRESH_MINUTES * 60
+    while not stop.is_set():
+        try:
+            # One refresh per interval, even if the worker restarts mid-interval
+            slot = int(time.time() // interval)
+            queue.enqueue('refresh_ready_pool', {'analyze_top': POOL_ANALYZE_TOP}, max_attempts=2,
+                          dedupe_key=f"refresh_ready_pool:{slot}")
+        except Exception as e:
+            print(f"Error queueing ready pool refresh: {e}")
+        stop.wait(interval)
+
 def run_scheduler():
-    poster = AINewsPoster()
-    
-    # Schedule the job to run daily at 9:00 AM UTC
-    schedule.every().day.at("09:00").do(poster.run)
-    
+    queue = JobQueue(JOB_QUEUE_PATH, backoff_seconds=JOB_RETRY_BACKOFF_SECONDS)
+
+    def post_job(job_id, due):
+        # Each slot gets its own run; retries resume that run's checkpoint instead of
+        # re-fetching, re-analyzing or, once it has posted, posting again
+        run_id = f"{job_id}-{due.strftime('%Y%m%d-%H%M%S')}"
+        queue.enqueue('post_digest', {'run_id': run_id, 'ready_pool': READY_POOL_ENABLED},
+                      max_attempts=JOB_MAX_ATTEMPTS, dedupe_key=f"post_digest:{due.isoformat()}")
+
+    # Jobs run in worker processes, so a slow DeepSeek or LinkedIn call only holds up its own job
+    pool = WorkerPool(JOB_QUEUE_PATH, HANDLERS, processes=WORKER_PROCESSES, lease_seconds=JOB_LEASE_SECONDS,
+                      backoff_seconds=JOB_RETRY_BACKOFF_SECONDS)
+    pool.start()
+
+    # Schedule the job to run daily at POST_TIME in POST_TIMEZONE (9:00 AM UTC by default)
+    scheduler = Scheduler(SCHEDULER_STATE_PATH, max_workers=1)
+    scheduler.add(
+        'daily-post', DailySchedule(POST_TIME, POST_TIMEZONE), post_job,
+        catch_up=SCHEDULER_CATCH_UP, max_lateness=SCHEDULER_MAX_LATENESS_HOURS * 3600
+    )
+
     print(f"\nScheduler started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC")
-    print("Will post daily at 9:00 AM UTC")
-    
+    print(f"Will post daily at {POST_TIME} {POST_TIMEZONE} using {pool.processes} worker processes")
+
+    # Analyze candidates ahead of time so the scheduled post doesn't wait on DeepSeek
+    if READY_POOL_ENABLED:
+        threading.Thread(
+            target=ingest_loop, args=(queue, threading.Event()), name="ingest", daemon=True
+        ).start()
+        print(f"Refreshing the ready pool every {POOL_REFRESH_MINUTES:g} minutes")
+
     # Register signal handler
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
-    
-    while True:
-        try:
-            schedule.run_pending()
-            time.sleep(60)
-        except Exception as e:
-            print(f"Error in scheduler loop: {e}")
-            time.sleep(60)  # Wait a minute before retrying
+
+    # Sleeps until the next due job instead of polling
+    try:
+        scheduler.run_forever()
+    finally:
+        pool.stop()
 
 if __name__ == "__main__":
-    run_scheduler() 
\ No newline at end of file
+    run_scheduler()